@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from io import StringIO
 import time
 import os
+from utils.data_loader import UPLOAD_TYPES, current_dataset, load_upload
+from utils.lazy import start_warmup
+from utils.memory import DatasetTooLarge, show_memory_status
+from utils.perf import begin_rerun, show_trace_panel
+from utils.tracing import span
 #run requirements.txt to install all required libraries
 #set up env for GROQ_API_KEY
 
@@ -16,6 +19,8 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+start_warmup()
+begin_rerun("Home")
 
 # Custom CSS for beautiful styling
 st.markdown("""
@@ -179,7 +184,7 @@ with col2:
     
     uploaded_file = st.file_uploader(
         "",
-        type=["csv", "xlsx", "xls"],
+        type=UPLOAD_TYPES,
         help="Upload your data file to get started with analysis"
     )
 
@@ -219,22 +224,11 @@ if uploaded_file:
         time.sleep(0.5)  # Small delay for better UX
         
         try:
-            # Determine file type and read accordingly
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-                file_type = "CSV"
-            elif uploaded_file.name.endswith((".xls", ".xlsx")):
-                df = pd.read_excel(uploaded_file)
-                file_type = "Excel"
-            elif uploaded_file.name.endswith(".json"):
-                df = pd.read_json(uploaded_file)
-                file_type = "JSON"
-            else:
-                st.error("❌ Unsupported file format")
-                st.stop()
-
-            # Store dataframe in session state
-            st.session_state["df"] = df
+            # Parsed once per file content and shared with every page
+            load_upload(uploaded_file)
+            df, info = current_dataset()
+            file_type = info["file_type"]
+            date_formats = info["date_formats"]
             
             # Success message
             st.markdown(f"""
@@ -267,6 +261,14 @@ if uploaded_file:
                 </div>
                 """, unsafe_allow_html=True)
             
+            if info.get("sample_fraction"):
+                st.warning(f"✂️ This file is too large for the server's memory budget, so a random "
+                           f"{info['sample_fraction']:.1%} of its rows was loaded ({len(df):,} rows).")
+            
+            if date_formats:
+                detected = ", ".join(f"{col} ({fmt})" for col, fmt in date_formats.items())
+                st.info(f"🕐 Detected datetime columns: {detected}")
+            
             # Data preview
             st.markdown("### 👀 Data Preview")
             st.markdown("Here's a quick look at your data:")
@@ -274,10 +276,10 @@ if uploaded_file:
             # Create tabs for different views
             tab1, tab2, tab3 = st.tabs(["📋 First 10 Rows", "📊 Data Types", "📈 Summary Statistics"])
             
-            with tab1:
+            with span("render.preview"), tab1:
                 st.dataframe(df.head(10), use_container_width=True)
             
-            with tab2:
+            with span("render.dtypes"), tab2:
                 dtype_df = pd.DataFrame({
                     'Column': df.columns,
                     'Data Type': df.dtypes.values,
@@ -286,7 +288,7 @@ if uploaded_file:
                 })
                 st.dataframe(dtype_df, use_container_width=True)
             
-            with tab3:
+            with span("render.describe"), tab3:
                 # Only show summary for numeric columns
                 numeric_df = df.select_dtypes(include=['number'])
                 if not numeric_df.empty:
@@ -308,6 +310,8 @@ if uploaded_file:
                 if st.button("📈 Create Visualizations", type="secondary", use_container_width=True):
                     st.success("Head to the Visualization page to create stunning charts!")
             
+        except DatasetTooLarge as e:
+            st.error(f"🐘 File too large: {str(e)}")
         except Exception as e:
             st.error(f"❌ Error processing file: {str(e)}")
             st.info("Please make sure your file is properly formatted and try again.")
@@ -353,3 +357,5 @@ st.markdown("""
 
 """, unsafe_allow_html=True)
 
+show_memory_status()
+show_trace_panel()
@@ -0,0 +1,130 @@
+"""Profile a directory of data files without Streamlit: one HTML and JSON report per file
+
+    python -m batch extracts/ --out reports --workers 8
+    python -m batch "extracts/**/*.csv" --out reports --clean-strategy median --offline
+
+Files are processed in parallel worker processes; a failing file is reported and the rest carry on.
+An index.html and summary.json list every file with its outcome.
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from streamlit.config import get_config_options
+from streamlit.logger import set_log_level
+
+from utils.data_loader import FILE_TYPES, read_frame
+from utils.report import build_report, render_html
+
+
+def find_files(patterns):
+    """Data files under the given directories and globs, in a stable order"""
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*')
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path) and os.path.splitext(path.lower())[1] in FILE_TYPES:
+                found.add(os.path.abspath(path))
+    return sorted(found)
+
+
+def report_name(path, root):
+    """Output file stem; paths relative to the common root keep same-named files apart"""
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    return relative.replace(os.sep, '__')
+
+
+def process_file(path, name, out_dir, clean_strategy, plotlyjs):
+    """Parse, profile and write the reports for one file; runs in a worker process"""
+    start = time.perf_counter()
+    row = {'file': path, 'name': name}
+    try:
+        with open(path, 'rb') as f:
+            df, date_formats = read_frame(f.read(), path)
+        report, figures = build_report(df, os.path.basename(path), clean_strategy)
+        report['date_formats'] = date_formats
+        with open(os.path.join(out_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        with open(os.path.join(out_dir, f"{name}.html"), 'w', encoding='utf-8') as f:
+            f.write(render_html(report, figures, plotlyjs))
+        row.update(rows=report['rows'], columns=report['columns'], missing=report['missing'],
+                   quality_score=report['quality']['quality_score'], html=f"{name}.html", json=f"{name}.json")
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['seconds'] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def write_index(rows, out_dir):
+    summary = pd.DataFrame(rows)
+    with open(os.path.join(out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+
+    lines = []
+    for row in rows:
+        if row.get('error'):
+            lines.append(f"<tr><td>{html.escape(row['name'])}</td><td colspan='4'>❌ {html.escape(row['error'])}</td>"
+                         f"<td>{row['seconds']:.2f}s</td></tr>")
+        else:
+            lines.append(f"<tr><td><a href='{html.escape(row['html'])}'>{html.escape(row['name'])}</a></td>"
+                         f"<td>{row['rows']:,}</td><td>{row['columns']}</td><td>{row['missing']:,}</td>"
+                         f"<td>{row['quality_score']}%</td><td>{row['seconds']:.2f}s</td></tr>")
+    failed = int(summary['error'].notna().sum()) if 'error' in summary else 0
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write("<!DOCTYPE html><html><head><meta charset='utf-8'><title>Batch EDA reports</title>"
+                "<style>body{font-family:sans-serif;margin:2rem} td,th{padding:.25rem .6rem;"
+                "border-bottom:1px solid #ddd}</style></head><body>"
+                f"<h1>📊 Batch EDA reports</h1><p>{len(rows)} files, {failed} failed</p>"
+                "<table><tr><th>File</th><th>Rows</th><th>Columns</th><th>Missing</th><th>Quality</th>"
+                "<th>Time</th></tr>" + "\n".join(lines) + "</table></body></html>")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless EDA reports for a directory or glob of data files")
+    parser.add_argument('inputs', nargs='+', help="Directories (searched recursively) or glob patterns")
+    parser.add_argument('--out', default='reports', help="Output directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--clean-strategy', default='auto', choices=['auto', 'median', 'mean'])
+    parser.add_argument('--offline', action='store_true',
+                        help="Inline plotly.js in every report instead of loading it from the CDN")
+    args = parser.parse_args()
+    # The shared modules are Streamlit-aware; their bare-mode notices are noise here
+    get_config_options()
+    set_log_level('error')
+
+    files = find_files(args.inputs)
+    if not files:
+        parser.error(f"no {'/'.join(FILE_TYPES)} files found in {' '.join(args.inputs)}")
+    os.makedirs(args.out, exist_ok=True)
+    root = os.path.commonpath([os.path.dirname(path) for path in files])
+    plotlyjs = True if args.offline else 'cdn'
+
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(process_file, path, report_name(path, root), args.out, args.clean_strategy, plotlyjs)
+                   for path in files]
+        for i, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            rows.append(row)
+            status = f"❌ {row['error']}" if row.get('error') else f"{row['rows']:,} rows"
+            print(f"[{i}/{len(files)}] {row['name']} ({row['seconds']:.2f}s) {status}", flush=True)
+
+    rows.sort(key=lambda row: row['name'])
+    failed = write_index(rows, args.out)
+    print(f"{len(files)} files in {time.perf_counter() - start:.1f}s, {failed} failed -> "
+          f"{os.path.join(args.out, 'index.html')}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Offline load testing and benchmarks; run from my_app with python -m bench.<module>"""
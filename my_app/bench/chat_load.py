@@ -0,0 +1,162 @@
+"""Drive the chat client with concurrent simulated users and report latency percentiles
+
+    python -m bench.chat_load --users 8 --requests 10            # against a bundled mock server
+    python -m bench.chat_load --base-url http://127.0.0.1:8787/v1  # against a running endpoint
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench.data import synthetic_frame
+from bench.mock_llm import add_options_arguments, options_from_args, start_server
+from utils.llm_client import LLMClient, estimate_request_tokens
+from utils.llm_context import DEFAULT_TOKEN_BUDGET, build_context, chat_payload
+
+QUESTIONS = [
+    "What are the key insights from this dataset?",
+    "Show me summary statistics",
+    "What patterns do you see in the data?",
+    "Are there any missing values or data quality issues?",
+    "What correlations exist between variables?",
+    "Which region has the highest revenue?",
+    "How does discount relate to units sold?",
+    "What is the average price per category?",
+]
+PERCENTILES = [50, 95, 99]
+
+
+def simulate_user(client, df, user, args, results):
+    """One user asking questions back to back, like a single chat session"""
+    for i in range(args.requests):
+        # --identical makes every user ask the same sequence, like a team clicking the same suggestion
+        question = QUESTIONS[(i if args.identical else user * args.requests + i) % len(QUESTIONS)]
+        context = build_context(df, question, token_budget=args.context_budget)
+        payload = chat_payload(question, context, args.model, 0.0, args.max_tokens)
+        stats = {}
+        error = None
+        start = time.perf_counter()
+        try:
+            if args.stream:
+                for _ in client.stream(payload, 'bench', stats=stats):
+                    pass
+            else:
+                client.complete(payload, 'bench', stats=stats)
+        except Exception as e:
+            error = type(e).__name__
+        usage = stats.get('usage') or {}
+        results.append({
+            'user': user,
+            'latency': time.perf_counter() - start,
+            'ttft': stats.get('ttft'),
+            'queue_wait': stats.get('queue_wait', 0.0),
+            'retries': stats.get('retries', 0),
+            'prompt_tokens': usage.get('prompt_tokens', estimate_request_tokens(payload) - args.max_tokens),
+            'completion_tokens': stats.get('completion_tokens', 0),
+            'error': error,
+        })
+        if args.think:
+            time.sleep(args.think)
+
+
+def run_load(client, df, args):
+    """All users in parallel threads; returns (per-request frame, wall seconds)"""
+    results = []
+    threads = [threading.Thread(target=simulate_user, args=(client, df, user, args, results))
+               for user in range(args.users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return pd.DataFrame(results), time.perf_counter() - start
+
+
+def summarize(results, wall, client=None):
+    """Percentiles and throughput as a JSON-friendly dict"""
+    ok = results[results['error'].isna()]
+    summary = {
+        'requests': len(results),
+        'errors': int(results['error'].notna().sum()),
+        'wall_seconds': round(wall, 3),
+        'requests_per_sec': round(len(ok) / wall, 2) if wall else None,
+        'completion_tokens_per_sec': round(ok['completion_tokens'].sum() / wall, 1) if wall else None,
+        'retries': int(results['retries'].sum()),
+    }
+    if client is not None:
+        summary['coalescing'] = client.coalescing_stats()
+    for column in ['latency', 'ttft', 'queue_wait']:
+        values = ok[column].dropna().to_numpy(dtype=float)
+        summary[column] = {f'p{p}': round(float(np.percentile(values, p)), 4) if len(values) else None
+                           for p in PERCENTILES}
+    prompt = ok['prompt_tokens'].to_numpy(dtype=float)
+    if len(prompt):
+        summary['prompt_tokens'] = {'min': int(prompt.min()), 'p50': int(np.percentile(prompt, 50)),
+                                    'p95': int(np.percentile(prompt, 95)), 'max': int(prompt.max())}
+    return summary
+
+
+def print_report(summary):
+    print(f"{summary['requests']} requests ({summary['errors']} errors, {summary['retries']} retries) "
+          f"in {summary['wall_seconds']:.2f}s -> {summary['requests_per_sec']} req/s, "
+          f"{summary['completion_tokens_per_sec']} completion tok/s")
+    table = pd.DataFrame({column: summary[column] for column in ['latency', 'ttft', 'queue_wait']}).T
+    print(table.to_string(float_format=lambda v: f"{v:.3f}s"))
+    if summary.get('coalescing', {}).get('coalesced'):
+        coalescing = summary['coalescing']
+        print(f"coalesced: {coalescing['coalesced']} of {coalescing['upstream'] + coalescing['coalesced']} "
+              f"requests shared an in-flight call ({coalescing['dedup_rate']:.0%})")
+    if 'prompt_tokens' in summary:
+        print("prompt tokens: " + ", ".join(f"{k} {v}" for k, v in summary['prompt_tokens'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent chat latency benchmark")
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=10, help="Questions per user")
+    parser.add_argument('--think', type=float, default=0.0, help="Pause between a user's questions")
+    parser.add_argument('--base-url', help="Endpoint to test; a mock server is started when omitted")
+    parser.add_argument('--model', default='llama-3.3-70b-versatile')
+    parser.add_argument('--max-tokens', type=int, default=600)
+    parser.add_argument('--context-budget', type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument('--no-stream', dest='stream', action='store_false')
+    parser.add_argument('--identical', action='store_true', help="All users ask the same questions in step")
+    parser.add_argument('--no-coalesce', dest='coalesce', action='store_false',
+                        help="Send identical concurrent requests separately")
+    parser.add_argument('--rpm', type=int, default=100_000, help="Client rate limit, requests per minute")
+    parser.add_argument('--tpm', type=int, default=100_000_000, help="Client rate limit, tokens per minute")
+    parser.add_argument('--csv', help="Dataset for the prompt context; synthetic when omitted")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--json', help="Write the summary and per-request results here")
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv) if args.csv else synthetic_frame(args.rows)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_server(options_from_args(args))
+        base_url = server.base_url
+
+    client = LLMClient(base_url=base_url, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                       coalesce=args.coalesce)
+    try:
+        results, wall = run_load(client, df, args)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    summary = summarize(results, wall, client)
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'summary': summary,
+                       'results': results.to_dict(orient='records')}, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
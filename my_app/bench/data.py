@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+CATEGORIES = ['Electronics', 'Clothing', 'Grocery', 'Home', 'Sports', 'Toys', 'Books']
+
+
+def synthetic_frame(rows=100_000, numeric_cols=8, seed=0):
+    """Sales-like frame with dates, categories, correlated measures and some missing values"""
+    rng = np.random.default_rng(seed)
+    units = rng.poisson(20, rows).astype(float)
+    price = rng.gamma(4, 12, rows)
+    df = pd.DataFrame({
+        'order_date': pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365 * 24 * 60, rows), unit='min'),
+        'region': rng.choice(REGIONS, rows),
+        'category': rng.choice(CATEGORIES, rows),
+        'units': units,
+        'price': price.round(2),
+        'revenue': (units * price).round(2),
+        'discount': np.clip(rng.normal(0.1, 0.05, rows), 0, 0.5).round(3),
+    })
+    for i in range(max(0, numeric_cols - 4)):
+        df[f'metric_{i}'] = rng.normal(0, 1, rows) + (0.5 * df['units'] if i % 2 else 0)
+    df.loc[rng.random(rows) < 0.02, 'discount'] = np.nan
+    return df
+
+
+def narrow_frame(rows, seed=0):
+    """Few columns: an id, one measure, one small category and a flag"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.normal(100, 15, rows),
+        'category': rng.choice(CATEGORIES, rows),
+        'flag': rng.random(rows) < 0.3,
+    })
+
+
+def wide_frame(rows, seed=0, numeric_cols=200, text_cols=5):
+    """Many numeric columns in correlated groups, plus a few categories"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 1, (rows, 10))
+    columns = {}
+    for i in range(numeric_cols):
+        columns[f'x{i}'] = factors[:, i % 10] * rng.uniform(0.3, 1) + rng.normal(0, 0.5, rows)
+    for i in range(text_cols):
+        columns[f'cat{i}'] = rng.choice(CATEGORIES[:3 + i], rows)
+    return pd.DataFrame(columns)
+
+
+def numeric_frame(rows, seed=0):
+    """The sales frame with extra numeric metrics"""
+    return synthetic_frame(rows, numeric_cols=20, seed=seed)
+
+
+def string_frame(rows, seed=0):
+    """Mostly text: low, medium and near-unique cardinality columns"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.gamma(2, 50, rows),
+        'quantity': rng.integers(1, 50, rows),
+        'region': rng.choice(REGIONS, rows),
+        'category': rng.choice(CATEGORIES, rows),
+    })
+    for name, cardinality in [('city', 500), ('product', 5_000), ('customer', max(rows // 2, 1))]:
+        df[name] = f"{name}_" + pd.Series(rng.integers(0, cardinality, rows)).astype(str)
+    df['comment'] = rng.choice(['ok', 'late delivery', 'damaged box', 'great service', 'refund requested'], rows)
+    return df
+
+
+def null_frame(rows, seed=0, missing=0.4):
+    """The sales frame with a large share of every column missing"""
+    rng = np.random.default_rng(seed)
+    df = synthetic_frame(rows, seed=seed)
+    for col in df.columns:
+        df.loc[rng.random(rows) < missing, col] = None
+    return df
+
+
+def time_frame(rows, seed=0):
+    """Minute-level readings in time order with trend, daily seasonality and noise"""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(rows)
+    daily = np.sin(2 * np.pi * minutes / (24 * 60))
+    return pd.DataFrame({
+        'timestamp': pd.Timestamp('2020-01-01') + pd.to_timedelta(minutes, unit='min'),
+        'sensor': rng.choice(['a', 'b', 'c', 'd'], rows),
+        'temperature': 20 + 5 * daily + minutes * 1e-5 + rng.normal(0, 0.5, rows),
+        'load': 50 + 20 * daily + rng.normal(0, 5, rows),
+        'errors': rng.poisson(0.2, rows),
+    })
+
+
+PROFILES = {
+    'narrow': narrow_frame,
+    'wide': wide_frame,
+    'numeric': numeric_frame,
+    'strings': string_frame,
+    'nulls': null_frame,
+    'timeseries': time_frame,
+}
+
+
+def make_frame(profile, rows, seed=0):
+    """Synthetic frame of one shape profile; the same profile, size and seed always give the same data"""
+    return PROFILES[profile](rows, seed=seed)
+
+
+def parse_rows(text):
+    """Row counts like 10k, 2.5M or 100000"""
+    text = text.strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
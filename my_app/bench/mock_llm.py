@@ -0,0 +1,221 @@
+"""Local stand-in for an OpenAI-compatible /v1/chat/completions endpoint
+
+    python -m bench.mock_llm --port 8787 --latency 0.3 --tokens-per-sec 80 --error-rate 0.02
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8787/v1.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "the data shows revenue growth across regions with seasonal peaks in the fourth quarter while "
+    "missing values remain low and the strongest correlation links units sold to discount levels"
+).split()
+
+
+class MockOptions:
+    """Behaviour of the mock server; every field can be set from the command line"""
+
+    def __init__(self, latency=0.3, jitter=0.1, tokens_per_sec=80.0, answer_tokens=60,
+                 rate_limit_rate=0.0, error_rate=0.0, retry_after=1.0, canned=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_sec = tokens_per_sec
+        self.answer_tokens = answer_tokens
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        # {substring of the question: answer}
+        self.canned = canned or {}
+        self.seed = seed
+
+
+def _question(body):
+    for message in reversed(body.get('messages', [])):
+        if message.get('role') == 'user':
+            return str(message.get('content') or '')
+    return ''
+
+
+def canned_answer(body, options):
+    """Deterministic answer for a request: a canned match, else words seeded by the question"""
+    question = _question(body)
+    for needle, answer in options.canned.items():
+        if needle.lower() in question.lower():
+            return answer.split(' ')
+    digest = hashlib.sha256(f"{options.seed}:{question}".encode()).digest()
+    rng = random.Random(digest)
+    n = min(options.answer_tokens, int(body.get('max_tokens') or options.answer_tokens))
+    return [rng.choice(WORDS) for _ in range(max(1, n))]
+
+
+def prompt_tokens(body):
+    return sum(len(str(m.get('content') or '')) for m in body.get('messages', [])) // 4
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def options(self):
+        return self.server.options
+
+    def _json(self, status, data, headers=None):
+        out = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _event(self, data):
+        self._chunk(f"data: {json.dumps(data) if isinstance(data, dict) else data}\n\n".encode())
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._json(200, {'object': 'list', 'data': [{'id': 'mock', 'object': 'model'}]})
+        else:
+            self._json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._json(404, {'error': {'message': 'Not found'}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        self.server.count_request()
+
+        roll = self.server.random()
+        if roll < self.options.rate_limit_rate:
+            self._json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                       {'Retry-After': f"{self.options.retry_after:g}"})
+            return
+        if roll < self.options.rate_limit_rate + self.options.error_rate:
+            self._json(503, {'error': {'message': 'Service unavailable', 'type': 'server_error'}})
+            return
+
+        time.sleep(max(0.0, self.options.latency + self.server.random(-1, 1) * self.options.jitter))
+        words = canned_answer(body, self.options)
+        usage = {'prompt_tokens': prompt_tokens(body), 'completion_tokens': len(words),
+                 'total_tokens': prompt_tokens(body) + len(words)}
+        interval = 1.0 / self.options.tokens_per_sec if self.options.tokens_per_sec > 0 else 0.0
+        model = body.get('model', 'mock')
+
+        if not body.get('stream'):
+            time.sleep(interval * len(words))
+            self._json(200, {'id': 'mock', 'object': 'chat.completion', 'model': model, 'usage': usage,
+                             'choices': [{'index': 0, 'finish_reason': 'stop',
+                                          'message': {'role': 'assistant', 'content': ' '.join(words)}}]})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                delta = {'content': word if i == 0 else ' ' + word}
+                self._event({'id': 'mock', 'object': 'chat.completion.chunk', 'model': model,
+                             'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})
+                time.sleep(interval)
+            self._event({'id': 'mock', 'object': 'chat.completion.chunk', 'model': model, 'choices': [],
+                         'usage': usage})
+            self._event('[DONE]')
+            self._chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. a cancelled stream
+            self.close_connection = True
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, MockHandler)
+        self.options = options
+        self.requests = 0
+        self._rng = random.Random(options.seed)
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections are routine here
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def random(self, low=0.0, high=1.0):
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(options=None, host='127.0.0.1', port=0):
+    """Serve on a background thread (port 0 picks a free port); call shutdown() when done"""
+    server = MockServer((host, port), options or MockOptions())
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
+
+
+def add_options_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Uniform +/- jitter on the latency")
+    parser.add_argument('--tokens-per-sec', type=float, default=80.0)
+    parser.add_argument('--answer-tokens', type=int, default=60)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--canned', help="JSON file mapping question substrings to answers")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def options_from_args(args):
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding='utf-8') as f:
+            canned = json.load(f)
+    return MockOptions(latency=args.latency, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+                       answer_tokens=args.answer_tokens, rate_limit_rate=args.rate_limit_rate,
+                       error_rate=args.error_rate, retry_after=args.retry_after, canned=canned, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer((args.host, args.port), options_from_args(args))
+    print(f"Mock LLM server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Cold-start cost of every page: first render in a fresh process, the imports it paid for, and a rerun
+
+    python -m bench.startup --json startup.json
+    python -m bench.startup --json new.json --baseline startup.json --fail-on-regression
+
+Each measurement runs in a newly spawned process (not forked, which would inherit the parent's imports).
+"cold" renders right after start; "warm" first waits for the server warm-up hook to finish.
+"""
+import argparse
+import builtins
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Only the standard library above: spawned workers import this module again before measuring
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'home': 'App.py',
+    'eda': 'pages/1_EDA.py',
+    'visualization': 'pages/2_Visualization.py',
+    'chatbot': 'pages/3_Chatbot.py',
+    'telemetry': 'pages/4_Telemetry.py',
+    'sql_console': 'pages/5_SQL_Console.py',
+}
+MODES = ['cold', 'warm']
+DEFAULT_ROWS = 10_000
+
+
+class ImportClock:
+    """Time spent in imports of modules not loaded yet, per outermost import
+
+    Covers import statements and importlib.import_module, which the app's lazy modules use.
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self._depth = 0
+        self._import = builtins.__import__
+        self._import_module = importlib.import_module
+
+    def __enter__(self):
+        builtins.__import__ = self._timed(self._import)
+        importlib.import_module = self._timed(self._import_module)
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+        return False
+
+    @property
+    def seconds(self):
+        return sum(self.modules.values())
+
+    def _timed(self, load):
+        def timed(name, *args, **kwargs):
+            if self._depth or name in sys.modules:
+                return load(name, *args, **kwargs)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return load(name, *args, **kwargs)
+            finally:
+                self._depth -= 1
+                self.modules[name] = self.modules.get(name, 0.0) + time.perf_counter() - start
+        return timed
+
+
+def measure_page(page, mode, rows):
+    """Render one page twice in this (fresh) process and report where the first render's time went"""
+    os.environ['APP_WARMUP'] = '1' if mode == 'warm' else '0'
+    os.environ.setdefault('APP_DATA_DIR', os.path.join(APP_DIR, '.appdata', 'bench-startup'))
+    sys.path.insert(0, APP_DIR)
+    import warnings
+    warnings.simplefilter('ignore')
+
+    start = time.perf_counter()
+    import streamlit  # noqa: F401 - paid once per server, reported separately
+    from streamlit.config import get_config_options
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    streamlit_seconds = time.perf_counter() - start
+    get_config_options()
+    set_log_level('error')
+
+    warmup_seconds = None
+    if mode == 'warm':
+        from utils.lazy import start_warmup
+        start = time.perf_counter()
+        start_warmup().join()
+        warmup_seconds = time.perf_counter() - start
+
+    app = AppTest.from_file(os.path.join(APP_DIR, PAGES[page]), default_timeout=300)
+    if rows:
+        from bench.data import make_frame
+        from utils.memory import get_governor
+        app.session_state['dataset'] = get_governor().register(make_frame('narrow', rows), 'bench.csv')
+        app.session_state['dataset_info'] = {'name': 'bench.csv', 'file_type': 'CSV', 'date_formats': {},
+                                             'sample_fraction': None, 'source': None}
+
+    with ImportClock() as clock:
+        start = time.perf_counter()
+        app.run()
+        first = time.perf_counter() - start
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+
+    top = sorted(clock.modules.items(), key=lambda item: -item[1])[:5]
+    return {
+        'page': page,
+        'mode': mode,
+        'rows': rows,
+        'streamlit_import_seconds': round(streamlit_seconds, 4),
+        'warmup_seconds': round(warmup_seconds, 4) if warmup_seconds is not None else None,
+        'first_run_seconds': round(first, 4),
+        'import_seconds': round(clock.seconds, 4),
+        'rerun_seconds': round(rerun, 4),
+        'top_imports': {name: round(s, 4) for name, s in top},
+        'errors': [str(e.value) for e in app.exception],
+    }
+
+
+def run_all(pages, modes, rows):
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for page in pages:
+        for mode in modes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    result = pool.submit(measure_page, page, mode, rows).result()
+                except Exception as e:
+                    result = {'page': page, 'mode': mode, 'rows': rows, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result):
+    label = f"{result['page']:<14} {result['mode']:<5}"
+    if 'error' in result:
+        return f"{label}  ERROR {result['error']}"
+    top = ', '.join(f"{name} {s * 1000:.0f}" for name, s in list(result['top_imports'].items())[:3])
+    errors = f"  page errors: {len(result['errors'])}" if result['errors'] else ""
+    return (f"{label}  first {result['first_run_seconds'] * 1000:>7.0f} ms  imports "
+            f"{result['import_seconds'] * 1000:>6.0f} ms  rerun {result['rerun_seconds'] * 1000:>6.0f} ms  "
+            f"[{top}]{errors}")
+
+
+def compare(results, baseline, threshold, noise_floor):
+    """(page, mode, baseline s, new s, ratio, regression) for runs present in both"""
+    old = {(r['page'], r['mode']): r for r in baseline['results'] if 'error' not in r}
+    rows = []
+    for r in results:
+        before = old.get((r['page'], r['mode']))
+        if 'error' in r or before is None:
+            continue
+        ratio = r['first_run_seconds'] / before['first_run_seconds'] if before['first_run_seconds'] else float('nan')
+        slower = r['first_run_seconds'] - before['first_run_seconds']
+        rows.append((r['page'], r['mode'], before['first_run_seconds'], r['first_run_seconds'], ratio,
+                     ratio > 1 + threshold and slower > noise_floor))
+    return rows
+
+
+def main():
+    from bench.suite import NOISE_FLOOR, environment
+
+    parser = argparse.ArgumentParser(description="Measure page cold-start time and import cost")
+    parser.add_argument('--pages', nargs='+', default=list(PAGES), choices=list(PAGES))
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="Rows of the loaded dataset; 0 for none")
+    parser.add_argument('--json', help="Write the results here")
+    parser.add_argument('--baseline', help="Results JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.20, help="Slowdown ratio counted as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    results = run_all(args.pages, args.modes, args.rows)
+    report = {'environment': environment(), 'args': vars(args), 'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold, NOISE_FLOOR)
+        print(f"\nAgainst baseline {baseline['environment'].get('commit') or ''} "
+              f"from {baseline['environment'].get('created', '?')}:")
+        for page, mode, before, after, ratio, regression in rows:
+            print(f"{page:<14} {mode:<5} {before * 1000:>7.0f} ms -> {after * 1000:>7.0f} ms  {ratio:5.2f}x"
+                  f"{'  REGRESSION' if regression else ''}")
+        if args.fail_on_regression and any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
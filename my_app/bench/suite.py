@@ -0,0 +1,292 @@
+"""Time ingestion, EDA, dashboard chart builders and chat context building on synthetic data
+
+    python -m bench.suite --profiles narrow wide --rows 10k 1M --json bench.json
+    python -m bench.suite --json new.json --baseline bench.json --fail-on-regression
+
+Every case runs in a fresh worker process, so peak RSS belongs to that case alone. Dashboard cases
+use the dashboard's default sample size unless --dashboard-rows says otherwise.
+"""
+import argparse
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from streamlit.config import get_config_options
+from streamlit.logger import set_log_level
+
+from bench.data import PROFILES, make_frame, parse_rows
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROWS = ['10k', '100k']
+DASHBOARD_ROWS = 5000
+QUESTION = "Which category has the highest revenue and how does discount relate to units?"
+# Changes smaller than this are timer noise, whatever the ratio
+NOISE_FLOOR = 0.005
+
+
+def load_page(filename):
+    """Import a Streamlit page as a module; its widgets render nowhere outside ``streamlit run``"""
+    spec = importlib.util.spec_from_file_location(f"page_{filename[:-3].lstrip('0123456789_')}",
+                                                  os.path.join(APP_DIR, 'pages', filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def clear_streamlit_caches():
+    import streamlit as st
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+# Each setup gets the frame, does untimed preparation and returns the callable to time
+
+def setup_read_csv(df):
+    from utils.data_loader import read_frame
+    data = df.to_csv(index=False).encode()
+    return lambda: read_frame(data, 'bench.csv')
+
+
+def setup_fingerprint(df):
+    from utils.dataset_version import fingerprint
+    return lambda: fingerprint(df)
+
+
+def _processor(df, backend):
+    from utils.eda import EDAProcessor
+    if backend == 'duckdb':
+        # The shared database starts once per server, not per query
+        from utils.sql_engine import get_engine
+        get_engine()
+    return EDAProcessor(df, backend)
+
+
+def setup_eda(method, backend='pandas'):
+    def setup(df):
+        return getattr(_processor(df, backend), method)
+    return setup
+
+
+def setup_aggregate(backend):
+    def setup(df):
+        processor = _processor(df, backend)
+        by = (processor.cat_cols or list(df.columns))[:2]
+        measures = [col for col in processor.num_cols if col not in by][:3]
+        return lambda: processor.aggregate(by, measures, 'mean' if measures else 'count')
+    return setup
+
+
+def setup_dashboard(method):
+    def setup(df):
+        page = load_page('2_Visualization.py')
+        # Chart libraries load on first use; time the charts, not the one-off imports
+        from utils.lazy import warm_imports
+        warm_imports()
+        import matplotlib.pyplot as plt
+
+        def run():
+            getattr(page.BeautifulDashboard(df), method)()
+            plt.close('all')
+        return run
+    return setup
+
+
+def setup_context(warm):
+    def setup(df):
+        from utils.llm_context import build_context
+        if warm:
+            build_context(df, QUESTION)
+        return lambda: build_context(df, QUESTION)
+    return setup
+
+
+# name -> (setup, uses the dashboard sample, keeps Streamlit caches between repeats)
+CASES = {
+    'ingest.read_csv': (setup_read_csv, False, False),
+    'ingest.fingerprint': (setup_fingerprint, False, False),
+    'eda.get_summary': (setup_eda('get_summary'), False, False),
+    'eda.get_stats': (setup_eda('get_stats'), False, False),
+    'eda.clean_data': (setup_eda('clean_data'), False, False),
+    'eda.get_stats_duckdb': (setup_eda('get_stats', 'duckdb'), False, False),
+    'eda.aggregate': (setup_aggregate('pandas'), False, False),
+    'eda.aggregate_duckdb': (setup_aggregate('duckdb'), False, False),
+    'dashboard.kpis': (setup_dashboard('show_beautiful_kpis'), True, False),
+    'dashboard.static_charts': (setup_dashboard('create_stunning_charts'), True, False),
+    'dashboard.interactive_charts': (setup_dashboard('create_interactive_charts'), True, False),
+    'dashboard.correlation_heatmap': (setup_dashboard('show_correlation_heatmap'), True, False),
+    'dashboard.insights': (setup_dashboard('show_data_insights'), True, False),
+    'dashboard.top_correlations': (setup_dashboard('show_top_correlations'), True, False),
+    'chat.context_cold': (setup_context(False), False, False),
+    'chat.context_warm': (setup_context(True), False, True),
+}
+
+
+def _rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def run_case(case, profile, rows, repeats, dashboard_rows):
+    """Run one case in this (fresh) process: repeated timings, then one traced run for allocations"""
+    sys.path.insert(0, APP_DIR)
+    # Bare-mode notices from every widget call would drown the report; config loading resets the level
+    get_config_options()
+    set_log_level('error')
+    warnings.simplefilter('ignore')
+    setup, sampled, warm = CASES[case]
+    df = make_frame(profile, rows)
+    if sampled:
+        df = df.head(dashboard_rows)
+    fn = setup(df)
+    rss_before = _rss_mb()
+
+    timings = []
+    for _ in range(repeats):
+        if not warm:
+            clear_streamlit_caches()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    rss_peak = _rss_mb()
+
+    if not warm:
+        clear_streamlit_caches()
+    tracemalloc.start()
+    fn()
+    allocated, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'case': case,
+        'profile': profile,
+        'rows': rows,
+        'case_rows': len(df),
+        'repeats': repeats,
+        'seconds': round(statistics.median(timings), 5),
+        'min_seconds': round(min(timings), 5),
+        'peak_rss_mb': round(rss_peak, 1),
+        'rss_growth_mb': round(rss_peak - rss_before, 1),
+        'alloc_peak_mb': round(alloc_peak / 1024 ** 2, 2),
+        'alloc_retained_mb': round(allocated / 1024 ** 2, 2),
+    }
+
+
+def run_suite(cases, profiles, rows_list, repeats, dashboard_rows):
+    """Every case over every profile and size, one worker process per case"""
+    results = []
+    for profile in profiles:
+        for rows in rows_list:
+            for case in cases:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    try:
+                        result = pool.submit(run_case, case, profile, rows, repeats, dashboard_rows).result()
+                    except Exception as e:
+                        result = {'case': case, 'profile': profile, 'rows': rows, 'error': f"{type(e).__name__}: {e}"}
+                results.append(result)
+                print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result):
+    label = f"{result['case']:<30} {result['profile']:<11} {result['rows']:>11,}"
+    if 'error' in result:
+        return f"{label}  ERROR {result['error']}"
+    return (f"{label}  {result['seconds'] * 1000:>10.1f} ms  rss {result['peak_rss_mb']:>7.0f} MB "
+            f"(+{result['rss_growth_mb']:.0f})  alloc peak {result['alloc_peak_mb']:>8.1f} MB")
+
+
+def environment():
+    """What the numbers depend on, stored with the results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Frame of cases present in both runs with time and allocation ratios; slower beyond threshold is a regression"""
+    key = ['case', 'profile', 'rows']
+    new = pd.DataFrame([r for r in results if 'error' not in r])
+    old = pd.DataFrame([r for r in baseline['results'] if 'error' not in r])
+    if new.empty or old.empty:
+        return pd.DataFrame()
+    merged = new.merge(old[key + ['seconds', 'alloc_peak_mb']], on=key, suffixes=('', '_baseline'))
+    merged['time_ratio'] = merged['seconds'] / merged['seconds_baseline']
+    merged['alloc_ratio'] = merged['alloc_peak_mb'] / merged['alloc_peak_mb_baseline'].replace(0, np.nan)
+    slower = merged['seconds'] - merged['seconds_baseline']
+    merged['regression'] = (merged['time_ratio'] > 1 + threshold) & (slower > NOISE_FLOOR)
+    merged['improvement'] = (merged['time_ratio'] < 1 - threshold) & (-slower > NOISE_FLOOR)
+    return merged[key + ['seconds_baseline', 'seconds', 'time_ratio', 'alloc_ratio', 'regression', 'improvement']]
+
+
+def print_comparison(comparison, baseline):
+    print(f"\nAgainst baseline {baseline['environment'].get('commit') or ''} "
+          f"from {baseline['environment'].get('created', '?')}:")
+    if comparison.empty:
+        print("no cases in common")
+        return
+    status = np.where(comparison['regression'], 'REGRESSION', np.where(comparison['improvement'], 'faster', ''))
+    print(comparison.drop(columns=['regression', 'improvement']).assign(status=status)
+          .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, EDA, dashboards and chat context building")
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--rows', nargs='+', default=DEFAULT_ROWS, help="Sizes like 10k 1M 100M")
+    parser.add_argument('--cases', nargs='+', default=['*'], help="Case names or patterns, e.g. 'eda.*'")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--dashboard-rows', type=int, default=DASHBOARD_ROWS,
+                        help="Sample size the dashboard cases run on, like the dashboard's sample slider")
+    parser.add_argument('--json', help="Write the results here")
+    parser.add_argument('--baseline', help="Results JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Slowdown ratio counted as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    cases = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+    if not cases:
+        parser.error(f"no cases match {args.cases}; available: {', '.join(CASES)}")
+    rows_list = [parse_rows(rows) for rows in args.rows]
+
+    results = run_suite(cases, args.profiles, rows_list, args.repeats, args.dashboard_rows)
+    report = {'environment': environment(), 'args': vars(args), 'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare(results, baseline, args.threshold)
+        print_comparison(comparison, baseline)
+        if args.fail_on_regression and not comparison.empty and comparison['regression'].any():
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
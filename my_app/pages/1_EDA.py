@@ -1,53 +1,12 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from io import BytesIO
+from utils.data_loader import current_dataset, set_dataset
+from utils.eda import AGGREGATES, BACKENDS, EDAProcessor
+from utils.lazy import start_warmup
+from utils.perf import begin_rerun, show_trace_panel
+from utils.tracing import span, traced
 
-class EDAProcessor:
-    def __init__(self, df):
-        self.df = df
-        self.num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        self.cat_cols = df.select_dtypes(include=['object']).columns.tolist()
-    
-    def clean_data(self, strategy='auto'):
-        """Clean data with flexible strategies"""
-        df_clean = self.df.copy()
-        
-        # Numeric columns
-        for col in self.num_cols:
-            if df_clean[col].isnull().any():
-                if strategy == 'median':
-                    df_clean[col].fillna(df_clean[col].median(), inplace=True)
-                elif strategy == 'mean':
-                    df_clean[col].fillna(df_clean[col].mean(), inplace=True)
-                else:  # auto
-                    df_clean[col].fillna(df_clean[col].median(), inplace=True)
-        
-        # Categorical columns
-        for col in self.cat_cols:
-            if df_clean[col].isnull().any() and not df_clean[col].mode().empty:
-                df_clean[col].fillna(df_clean[col].mode()[0], inplace=True)
-        
-        return df_clean
-    
-    def get_summary(self):
-        """Get data summary"""
-        return {
-            'shape': self.df.shape,
-            'missing': self.df.isnull().sum().sum(),
-            'dtypes': self.df.dtypes.value_counts().to_dict(),
-            'memory_mb': round(self.df.memory_usage(deep=True).sum() / 1024**2, 2)
-        }
-    
-    def get_stats(self):
-        """Get statistical information"""
-        stats = {}
-        if self.num_cols:
-            stats['numeric'] = self.df[self.num_cols].describe()
-        if self.cat_cols:
-            stats['categorical'] = {col: self.df[col].value_counts().head() for col in self.cat_cols[:5]}
-        return stats
-
+@traced("render.overview")
 def show_overview(processor):
     """Display data overview"""
     summary = processor.get_summary()
@@ -58,6 +17,7 @@ def show_overview(processor):
     col3.metric("Missing", summary['missing'])
     col4.metric("Memory (MB)", summary['memory_mb'])
 
+@traced("render.analysis")
 def show_analysis(processor):
     """Display analysis based on data types"""
     stats = processor.get_stats()
@@ -70,9 +30,15 @@ def show_analysis(processor):
         # Simple correlation if multiple numeric columns
         if len(processor.num_cols) > 1:
             st.subheader("Correlations")
-            corr = processor.df[processor.num_cols].corr()
+            with span("correlation.matrix", columns=len(processor.num_cols)):
+                corr = processor.df[processor.num_cols].corr()
             st.dataframe(corr.round(3))
     
+    # Datetime analysis
+    if 'datetime' in stats:
+        st.subheader("Datetime Variables")
+        st.dataframe(stats['datetime'])
+    
     # Categorical analysis
     if 'categorical' in stats:
         st.subheader("Categorical Variables")
@@ -80,6 +46,24 @@ def show_analysis(processor):
             with st.expander(f"{col} - Top Values"):
                 st.dataframe(counts)
 
+@traced("render.group_by")
+def show_group_by(processor):
+    """Ad-hoc aggregation over the categorical columns"""
+    if not processor.cat_cols:
+        st.info("No categorical columns to group by.")
+        return
+    col1, col2, col3 = st.columns([2, 2, 1])
+    by = col1.multiselect("Group By", processor.cat_cols, default=processor.cat_cols[:1])
+    measures = col2.multiselect("Measures", processor.num_cols, default=processor.num_cols[:1])
+    agg = col3.selectbox("Aggregate", AGGREGATES)
+    if not by or (agg != 'count' and not measures):
+        st.info("Pick columns to group by and at least one measure (or the count aggregate).")
+        return
+    table = processor.aggregate(by, measures, agg)
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption(f"{len(table):,} groups")
+
+@traced("render.downloads")
 def download_data(df, filename="processed_data"):
     """Flexible download function"""
     col1, col2 = st.columns(2)
@@ -98,17 +82,20 @@ def main():
     try:
         st.title("🔧 Flexible EDA Tool")
         
-        if "df" not in st.session_state:
+        df, _ = current_dataset()
+        if df is None:
             st.warning("⚠️ Upload data first")
             return
         
-        # Initialize processor
-        processor = EDAProcessor(st.session_state["df"])
-        
         # Sidebar controls
         st.sidebar.header("Options")
         clean_strategy = st.sidebar.selectbox("Clean Strategy", ["auto", "median", "mean"])
         show_raw = st.sidebar.checkbox("Show Raw Data")
+        backend = st.sidebar.selectbox("Engine", BACKENDS, format_func={'pandas': 'pandas', 'duckdb': 'DuckDB'}.get,
+                                       help="DuckDB computes statistics and group-bys with parallel SQL scans")
+        
+        # Initialize processor
+        processor = EDAProcessor(df, backend)
         
         # Main content
         if show_raw:
@@ -121,16 +108,19 @@ def main():
         st.subheader("Analysis")
         show_analysis(processor)
         
+        st.subheader("Group By")
+        show_group_by(processor)
+        
         # Cleaning
         if st.button("🧹 Clean Data"):
             cleaned_df = processor.clean_data(clean_strategy)
-            st.session_state["df"] = cleaned_df
+            set_dataset(cleaned_df)
             st.success("Data cleaned!")
             st.rerun()
         
         # Download
         st.subheader("Download")
-        download_data(st.session_state["df"])
+        download_data(processor.df)
         
     except Exception as e:
         if "ScriptRunContext" in str(e):
@@ -149,4 +139,7 @@ if __name__ == "__main__":
     except:
         pass
     
-    main()
\ No newline at end of file
+    start_warmup()
+    begin_rerun("EDA")
+    main()
+    show_trace_panel()
\ No newline at end of file
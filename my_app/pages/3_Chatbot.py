@@ -1,8 +1,35 @@
+import json
 import os
+import time
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import requests  # Use this instead of groq package
+from utils.chat_store import PAGE_SIZE, SHARED_SEARCH, get_chat_store, new_owner_token, new_session_id
+from utils.chat_memory import DEFAULT_MEMORY_BUDGET, ConversationMemory
+from utils.llm_client import (coalescing_stats, complete_chat, complete_chat_with_tools, stream_chat,
+                              stream_chat_with_tools)
+from utils.dataset_version import dataset_version
+from utils.data_loader import UPLOAD_TYPES, current_dataset, load_upload
+from utils.llm_context import DEFAULT_TOKEN_BUDGET, build_context, chat_payload, estimate_tokens
+from utils.model_router import AUTO, DEFAULT_LATENCY_TARGET, get_router
+from utils.lazy import start_warmup
+from utils.perf import begin_rerun, show_trace_panel
+from utils.prefetch import PrefetchJob
+from utils.query_plan import QUERY_TOOL, query_tool_handler
+from utils.telemetry import record_request
+from utils.tracing import span, traced
+from utils.response_cache import ResponseCache, get_response_cache, normalize_question
+
+# Bump when the system prompt or context format changes so old cached answers are not reused
+PROMPT_VERSION = 1
+
+EXAMPLE_QUESTIONS = [
+    "What are the key insights from this dataset?",
+    "Show me summary statistics",
+    "What patterns do you see in the data?",
+    "Are there any missing values or data quality issues?",
+    "What correlations exist between variables?"
+]
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +38,8 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+start_warmup()
+begin_rerun("Chatbot")
 
 # Custom CSS for better styling
 st.markdown("""
@@ -126,11 +155,37 @@ st.markdown("""
 GROQ_API_KEY = st.secrets.get("GROQ_API_KEY", os.getenv("GROQ_API_KEY"))
 
 # Initialize session state
+if "chat_owner" not in st.session_state:
+    # A secret per browser tab, kept in the URL next to the chat id; only its owner can reopen a chat
+    st.session_state.chat_owner = st.query_params.get("owner") or new_owner_token()
+    st.query_params["owner"] = st.session_state.chat_owner
+
+if "chat_session" not in st.session_state:
+    # The chat id lives in the URL, so a reload resumes the same conversation
+    chat = st.query_params.get("chat")
+    if not chat or get_chat_store().owned_by_other(chat, st.session_state.chat_owner):
+        chat = new_session_id()
+    st.session_state.chat_session = chat
+    st.query_params["chat"] = st.session_state.chat_session
+
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = [
+        (question, answer, datetime.fromtimestamp(created).strftime("%H:%M:%S"), stats)
+        for question, answer, created, stats
+        in get_chat_store().turns(st.session_state.chat_session, st.session_state.chat_owner)
+    ]
+
+if "history_page" not in st.session_state:
+    st.session_state.history_page = 0
+
+if "memory" not in st.session_state:
+    st.session_state.memory = ConversationMemory()
+
+if "prefetch" not in st.session_state:
+    st.session_state.prefetch = None
 
-if "df" not in st.session_state:
-    st.session_state.df = None
+if "cache_stats" not in st.session_state:
+    st.session_state.cache_stats = {"lookups": 0, "hits": 0, "saved": 0.0}
 
 # Header
 st.markdown("""
@@ -158,110 +213,341 @@ with st.sidebar:
     model_options = {
         "llama-3.3-70b-versatile": "Llama 3.3 70B (Recommended)",
         "llama-3.1-70b-versatile": "Llama 3.1 70B",
-        "mixtral-8x7b-32768": "Mixtral 8x7B"
+        "mixtral-8x7b-32768": "Mixtral 8x7B",
+        "llama-3.1-8b-instant": "Llama 3.1 8B Instant (Fastest)",
+        AUTO: "🧭 Auto (latency-aware)"
     }
     
-    selected_model = st.selectbox(
+    model_choice = st.selectbox(
         "Choose Model:",
         options=list(model_options.keys()),
         format_func=lambda x: model_options[x],
         index=0
     )
+    # Summaries and prefetches use the recommended model when routing is on
+    selected_model = next(iter(model_options)) if model_choice == AUTO else model_choice
+    latency_target = st.slider("Latency Target (s)", 1.0, 15.0, DEFAULT_LATENCY_TARGET, 0.5,
+                               disabled=model_choice != AUTO,
+                               help="Auto mode picks the smallest model suited to the question that is "
+                                    "expected to answer within this time, and avoids rate-limited models")
     
     temperature = st.slider("Temperature", 0.0, 1.0, 0.7, 0.1)
     max_tokens = st.slider("Max Tokens", 100, 1000, 600, 50)
+    stream_responses = st.toggle("⚡ Stream responses", value=True,
+                                 help="Show the answer token by token as it is generated")
+    context_budget = st.slider("Context Budget (tokens)", 200, 4000, DEFAULT_TOKEN_BUDGET, 100,
+                               help="Upper bound on dataset context sent with each question")
+    remember_chat = st.toggle("🧠 Remember conversation", value=True,
+                              help="Send recent turns and a rolling summary of older ones with each question")
+    memory_budget = st.slider("Memory Budget (tokens)", 0, 3000, DEFAULT_MEMORY_BUDGET, 100,
+                              disabled=not remember_chat,
+                              help="Hard cap on conversation history sent with each question")
+    run_queries = st.toggle("🧮 Exact answers from queries", value=True,
+                            help="Let the AI run filter / group-by queries on the full dataset "
+                                 "instead of guessing from a summary")
+    use_cache = st.toggle("💾 Reuse cached answers", value=True,
+                          help="Answer repeated questions on the same dataset from the shared cache")
+    cache_sampled = st.checkbox("Cache answers at temperature > 0", value=False,
+                                disabled=not use_cache,
+                                help="Sampled answers vary between calls; off by default")
+    prefetch_examples = st.toggle("🔮 Prefetch suggested answers", value=False,
+                                  disabled=not use_cache,
+                                  help="Answer the example questions in the background when a dataset is loaded, "
+                                       "using only spare rate limit budget")
     
     st.markdown("---")
     
-    # Data upload section
+    # Data upload section: the dataset loaded on the home page is reused as is
     st.markdown("### 📊 Data Upload")
     uploaded_file = st.file_uploader(
-        "Upload CSV file for analysis",
-        type=['csv'],
-        help="Upload a CSV file to enable data-specific queries"
+        "Upload a file for analysis",
+        type=UPLOAD_TYPES,
+        help="Upload a file to enable data-specific queries, or use the one loaded on the home page"
     )
     
     if uploaded_file:
         try:
-            df = pd.read_csv(uploaded_file)
-            st.session_state.df = df
-            st.success(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns")
-            
-            # Show basic info
-            st.markdown("**Dataset Info:**")
-            st.write(f"• Shape: {df.shape}")
-            st.write(f"• Columns: {', '.join(df.columns[:3])}{'...' if len(df.columns) > 3 else ''}")
-            
+            load_upload(uploaded_file)
         except Exception as e:
             st.error(f"Error loading file: {str(e)}")
     
+    df, dataset_info = current_dataset()
+    if df is not None:
+        source = f" from {dataset_info['name']}" if dataset_info else ""
+        st.success(f"✅ Using {len(df)} rows, {len(df.columns)} columns{source}")
+        
+        # Show basic info
+        st.markdown("**Dataset Info:**")
+        st.write(f"• Shape: {df.shape}")
+        st.write(f"• Columns: {', '.join(map(str, df.columns[:3]))}{'...' if len(df.columns) > 3 else ''}")
+    
     st.markdown("---")
     
     # Chat controls
     st.markdown("### 💬 Chat Controls")
+    if st.button("🆕 New Chat"):
+        st.session_state.chat_session = new_session_id()
+        st.query_params["chat"] = st.session_state.chat_session
+        st.session_state.chat_history = []
+        st.session_state.memory.reset()
+        st.rerun()
     if st.button("🗑️ Clear Chat History"):
+        get_chat_store().clear(st.session_state.chat_session, st.session_state.chat_owner)
         st.session_state.chat_history = []
+        st.session_state.memory.reset()
         st.rerun()
+    if st.button("🧹 Clear Answer Cache"):
+        get_response_cache().clear()
+        st.toast("Answer cache cleared")
+    
+    # Full-text search over saved conversations
+    search_text = st.text_input("🔎 Search past questions", placeholder="e.g. revenue by region")
+    # Only this browser's chats, unless the server opts into shared search
+    search_all = st.checkbox("Search everyone's chats" if SHARED_SEARCH else "Search all my chats", value=False)
+    if search_text.strip():
+        hits = get_chat_store().search(search_text,
+                                       owner=None if search_all and SHARED_SEARCH else st.session_state.chat_owner,
+                                       session_id=None if search_all else st.session_state.chat_session)
+        if not hits:
+            st.caption("No matches")
+        for hit in hits:
+            when = datetime.fromtimestamp(hit["created"]).strftime("%Y-%m-%d %H:%M")
+            st.markdown(f"**{hit['question']}**  \n{hit['snippet']}")
+            st.caption(f"🕐 {when}" + ("" if hit["session_id"] == st.session_state.chat_session else " • other chat"))
 
 # Function to call Groq API directly using requests
-def ask_groq_api(user_question, df=None):
-    """Call Groq API directly without the groq package"""
-    
+@traced("llm.context")
+def build_payload(user_question, df=None, history_messages=None):
+    """Chat completion request for a question with the current settings"""
     context = ""
     if df is not None:
         try:
-            # Get dataset summary
-            context = f"""
-            Dataset Summary:
-            - Shape: {df.shape}
-            - Columns: {list(df.columns)}
-            - Data types: {df.dtypes.to_dict()}
-            
-            Sample data (first 5 rows):
-            {df.head(5).to_string()}
-            
-            Statistical summary:
-            {df.describe().to_string()}
-            """
+            # Cached per dataset; only columns relevant to the question, within the token budget
+            context = build_context(df, user_question, token_budget=context_budget)
         except Exception:
             context = "Could not parse dataframe."
     
-    # Prepare the API request
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    tools = [QUERY_TOOL] if df is not None and run_queries else None
+    return chat_payload(user_question, context, selected_model, temperature, max_tokens,
+                        history_messages=history_messages, tools=tools)
+
+def ask_groq_api(user_question, df=None, stream=False, stats=None, history_messages=None):
+    """Call Groq API directly without the groq package
     
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    With ``stream=True`` this returns a generator of answer chunks instead of a string.
+    """
+    start = time.perf_counter()
+    payload = build_payload(user_question, df, history_messages)
+    if model_choice == AUTO:
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in payload["messages"])
+        payload["model"], route = get_router().route(user_question, prompt_tokens, max_tokens, latency_target)
+        if stats is not None:
+            stats["route"] = route
+    if stats is not None:
+        stats["model"] = payload["model"]
+        stats["context_time"] = round(time.perf_counter() - start, 4)
+        stats["context_tokens"] = estimate_tokens(payload["messages"][-1]["content"])
+    handler = None
+    if "tools" in payload:
+        # Queries run locally on the full frame; only their small results go back to the model
+        handler = query_tool_handler(df, log=stats.setdefault("queries", []) if stats is not None else None)
     
-    payload = {
-        "model": selected_model,
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are a direct AI assistant. Give short, clear, straight-to-the-point answers. No lengthy explanations unless specifically asked. Be concise and factual."
-            },
-            {
-                "role": "user",
-                "content": f"Dataset Context:\n{context}\n\nUser Question: {user_question}"
-            }
-        ],
-        "temperature": temperature,
-        "max_tokens": max_tokens
-    }
+    if stream:
+        return stream_groq_api(payload, stats, handler)
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()  # Raise error for bad status codes
-        
-        data = response.json()
-        return data['choices'][0]['message']['content']
+        with span("llm.request", model=payload["model"], tools=handler is not None):
+            if handler:
+                return complete_chat_with_tools(payload, GROQ_API_KEY, handler, stats=stats)
+            return complete_chat(payload, GROQ_API_KEY, stats=stats)
         
     except requests.exceptions.RequestException as e:
+        if stats is not None:
+            stats["error"] = True
         return f"Error calling Groq API: {str(e)}"
     except (KeyError, IndexError) as e:
+        if stats is not None:
+            stats["error"] = True
         return f"Error parsing response: {str(e)}"
 
+def stream_groq_api(payload, stats=None, handler=None):
+    """Yield answer chunks; errors are yielded as text like the blocking call returns them"""
+    stats = stats if stats is not None else {}
+    try:
+        with span("llm.stream", model=payload["model"], tools=handler is not None):
+            if handler:
+                yield from stream_chat_with_tools(payload, GROQ_API_KEY, handler, stats=stats)
+            else:
+                yield from stream_chat(payload, GROQ_API_KEY, stats=stats)
+    except requests.exceptions.RequestException as e:
+        stats["error"] = True
+        yield f"Error calling Groq API: {str(e)}"
+    except (KeyError, IndexError, ValueError) as e:
+        stats["error"] = True
+        yield f"Error parsing response: {str(e)}"
+
+def answer_cache_key(user_question, df=None, history_messages=None):
+    """Cache key for a question, or None when caching is off for the current settings"""
+    if not use_cache or (temperature > 0 and not cache_sampled):
+        return None
+    # Follow-ups only match the same conversation; a fresh chat shares answers (and prefetches)
+    history = {"history": history_messages} if history_messages else {}
+    return ResponseCache.make_key(
+        **history,
+        model=model_choice,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        context_budget=context_budget,
+        dataset=dataset_version(df),
+        question=normalize_question(user_question),
+        queries=run_queries,
+        prompt_version=PROMPT_VERSION
+    )
+
+@traced("cache.lookup")
+def cached_answer(key):
+    """Look up a cached answer; returns (answer, stats) or None"""
+    if key is None:
+        return None
+    start = time.perf_counter()
+    entry = get_response_cache().get(key)
+    st.session_state.cache_stats["lookups"] += 1
+    if entry is None:
+        return None
+    st.session_state.cache_stats["hits"] += 1
+    st.session_state.cache_stats["saved"] += entry["latency"]
+    return entry["answer"], {"cache": "hit", "total": round(time.perf_counter() - start, 4),
+                             "saved": entry["latency"]}
+
+def store_answer(key, answer, stats):
+    """Cache a completed answer; errors and stopped answers are never stored"""
+    if key is None or not answer or stats.get("error") or stats.get("cancelled"):
+        return
+    get_response_cache().put(key, answer, stats.get("total", 0.0), meta={"model": stats.get("model", selected_model)})
+
+def record_stream(chunks, turn):
+    """Keep the partial answer in session state so a stopped stream isn't lost"""
+    for chunk in chunks:
+        turn["answer"] += chunk
+        yield chunk
+
+def add_turn(question, answer, timestamp, stats):
+    """Append a turn to the chat history and save it"""
+    st.session_state.chat_history.append((question, answer, timestamp, stats))
+    df, _ = current_dataset()
+    dataset = dataset_version(df) if df is not None else None
+    get_chat_store().add(st.session_state.chat_session, st.session_state.chat_owner, question, answer, stats,
+                         dataset=dataset)
+    record_request("chat", stats, stats.get("model", selected_model), session_id=st.session_state.chat_session, dataset=dataset,
+                   dataset_label=f"{len(df):,} rows × {len(df.columns)} cols" if df is not None else None,
+                   streamed=int(stream_responses and stats.get("cache") != "hit"))
+    # Jump back to the newest page
+    st.session_state.history_page = 0
+
+def finish_turn(turn, stopped=False):
+    """Move a pending turn into the chat history"""
+    answer = turn["answer"]
+    if stopped:
+        answer = (answer + " ⏹️ *(stopped)*").strip()
+        turn["stats"]["cancelled"] = True
+    add_turn(turn["question"], answer, turn["timestamp"], turn["stats"])
+    st.session_state.pending_turn = None
+
+def show_history_page(history):
+    """Render one page of turns (newest page first), so rerun cost doesn't grow with the history"""
+    pages = (len(history) - 1) // PAGE_SIZE + 1
+    page = min(st.session_state.history_page, pages - 1)
+    end = len(history) - page * PAGE_SIZE
+    start = max(0, end - PAGE_SIZE)
+    for i in range(start, end):
+        question, answer, timestamp, stats = history[i]
+        with st.expander(f"💭 Query {i+1} - {timestamp}", expanded=(i == len(history)-1)):
+            st.markdown(f'<div class="user-message"><strong>You:</strong> {question}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="bot-message"><strong>AI:</strong> {answer}</div>', unsafe_allow_html=True)
+            if format_turn_stats(stats):
+                st.caption(format_turn_stats(stats))
+            for query in stats.get("queries", []):
+                st.code(json.dumps(query["plan"]) if isinstance(query["plan"], dict) else str(query["plan"]),
+                        language="json")
+    
+    if pages > 1:
+        nav_older, nav_info, nav_newer = st.columns([1, 2, 1])
+        nav_older.button("◀ Older", key="history_older", disabled=page >= pages - 1,
+                         on_click=lambda: st.session_state.update(history_page=page + 1))
+        nav_info.caption(f"Queries {start + 1}–{end} of {len(history)} • page {page + 1} of {pages}")
+        nav_newer.button("Newer ▶", key="history_newer", disabled=page == 0,
+                         on_click=lambda: st.session_state.update(history_page=page - 1))
+
+def update_prefetch(df):
+    """Start prefetching the example answers for this dataset and settings, replacing a stale job"""
+    job = st.session_state.prefetch
+    if not prefetch_examples or df is None:
+        if job is not None:
+            job.cancel()
+            st.session_state.prefetch = None
+        return
+
+    keys = [answer_cache_key(question, df) for question in EXAMPLE_QUESTIONS]
+    if None in keys or (job is not None and [key for _, key, _ in job.jobs] == keys):
+        return
+    if job is not None:
+        job.cancel()
+    jobs = [(question, key, build_payload(question, df)) for question, key in zip(EXAMPLE_QUESTIONS, keys)]
+    st.session_state.prefetch = PrefetchJob(jobs, GROQ_API_KEY, model=selected_model,
+                                              tool_handler=query_tool_handler(df) if run_queries else None).start()
+
+def show_prefetch_status():
+    """Progress of the background prefetch; polls only while the job is running"""
+    job = st.session_state.prefetch
+    if job is not None:
+        st.fragment(prefetch_status, run_every=None if job.done else 1)(job, live=not job.done)
+
+def prefetch_status(job, live):
+    counts = job.counts()
+    ready = counts.get("done", 0) + counts.get("cached", 0)
+    if job.done and live:
+        # Finished while polling: one full rerun stops the timer
+        st.rerun()
+    if job.done:
+        note = f"🔮 {ready}/{len(job.jobs)} suggested answers ready"
+        if counts.get("skipped"):
+            note += f" • {counts['skipped']} skipped to stay within the rate limit"
+        if counts.get("cancelled"):
+            note += f" • {counts['cancelled']} cancelled"
+        st.caption(note)
+        return
+    col_status, col_cancel = st.columns([3, 1])
+    col_status.caption(f"🔮 Prefetching suggested answers... {ready}/{len(job.jobs)} ready")
+    if col_cancel.button("✋ Cancel prefetch", key="cancel_prefetch"):
+        job.cancel()
+
+def format_turn_stats(stats):
+    """One-line latency summary for a chat turn"""
+    parts = []
+    if stats.get("ttft") is not None:
+        parts.append(f"⚡ First token {stats['ttft']:.2f}s")
+    if stats.get("total") is not None:
+        parts.append(f"⏱️ Total {stats['total']:.2f}s")
+    if stats.get("tokens_per_sec"):
+        parts.append(f"🚀 {stats['tokens_per_sec']:.0f} tok/s")
+    if stats.get("queue_wait", 0) >= 0.1:
+        parts.append(f"⏳ Queued {stats['queue_wait']:.1f}s")
+    if stats.get("retries"):
+        parts.append(f"🔁 {stats['retries']} retries")
+    if stats.get("queries"):
+        parts.append(f"🧮 {len(stats['queries'])} {'query' if len(stats['queries']) == 1 else 'queries'} run locally")
+    if stats.get("coalesced"):
+        parts.append("🔗 Shared an identical in-flight request")
+    if stats.get("route"):
+        parts.append(f"🧭 Routed to {stats['model']} ({stats['route']})")
+    if stats.get("cache") == "hit":
+        parts.append(f"💾 Cached answer (saved {stats.get('saved', 0):.1f}s)")
+    return " • ".join(parts)
+
+# A stream interrupted by the stop button (or any other rerun) is kept as a stopped answer
+if st.session_state.get("pending_turn"):
+    finish_turn(st.session_state.pending_turn, stopped=True)
+
 # Main content area
 if GROQ_API_KEY:
     col1, col2 = st.columns([2, 1])
@@ -273,29 +559,23 @@ if GROQ_API_KEY:
         # Display chat history
         if st.session_state.chat_history:
             st.markdown("### 📝 Conversation History")
-            for i, (question, answer, timestamp) in enumerate(st.session_state.chat_history):
-                with st.expander(f"💭 Query {i+1} - {timestamp}", expanded=(i == len(st.session_state.chat_history)-1)):
-                    st.markdown(f'<div class="user-message"><strong>You:</strong> {question}</div>', unsafe_allow_html=True)
-                    st.markdown(f'<div class="bot-message"><strong>AI:</strong> {answer}</div>', unsafe_allow_html=True)
+            with span("render.history", turns=len(st.session_state.chat_history)):
+                show_history_page(st.session_state.chat_history)
         
         # Input section
         st.markdown("### ✨ Ask a Question")
         
         # Example questions
-        if st.session_state.df is not None:
+        update_prefetch(df)
+        if df is not None:
             st.markdown("**💡 Try these example questions:**")
-            examples = [
-                "What are the key insights from this dataset?",
-                "Show me summary statistics",
-                "What patterns do you see in the data?",
-                "Are there any missing values or data quality issues?",
-                "What correlations exist between variables?"
-            ]
+            examples = EXAMPLE_QUESTIONS
             example_buttons = st.columns(len(examples))
             for i, example in enumerate(examples):
                 with example_buttons[i % len(example_buttons)]:
                     if st.button(f"📊 {example[:20]}...", key=f"example_{i}"):
                         st.session_state.current_question = example
+            show_prefetch_status()
         
         # Question input
         user_input = st.text_area(
@@ -323,16 +603,56 @@ if GROQ_API_KEY:
                 st.session_state.current_question = random.choice(random_questions)
                 st.rerun()
         
-        # Process question
+        # Conversation so far, within the memory budget; older turns are summarized in the background
+        history_messages = []
+        if remember_chat:
+            st.session_state.memory.refresh(st.session_state.chat_history, GROQ_API_KEY, selected_model)
+            history_messages = st.session_state.memory.messages(st.session_state.chat_history, memory_budget)
+        
+        # Repeated questions are answered from the shared cache without calling the API
+        cache_key = None
         if submit_button and user_input.strip():
+            cache_key = answer_cache_key(user_input, df, history_messages)
+            cache_state = "off" if cache_key is None else "miss"
+            hit = cached_answer(cache_key)
+            if hit:
+                reply, stats = hit
+                timestamp = datetime.now().strftime("%H:%M:%S")
+                add_turn(user_input, reply, timestamp, stats)
+                st.session_state.current_question = ""
+                st.rerun()
+        
+        # Process question
+        if submit_button and user_input.strip() and stream_responses:
+            turn = {
+                "question": user_input,
+                "answer": "",
+                "timestamp": datetime.now().strftime("%H:%M:%S"),
+                "stats": {"cache": cache_state}
+            }
+            st.session_state.pending_turn = turn
+            
+            st.markdown(f'<div class="user-message"><strong>You:</strong> {user_input}</div>', unsafe_allow_html=True)
+            # Clicking stop reruns the script, which interrupts the stream
+            st.button("⏹️ Stop generating", key="stop_stream")
+            with st.container(border=True):
+                st.write_stream(record_stream(ask_groq_api(user_input, df=df, stream=True, stats=turn["stats"],
+                                                          history_messages=history_messages), turn))
+            
+            finish_turn(turn)
+            store_answer(cache_key, turn["answer"], turn["stats"])
+            st.session_state.current_question = ""
+            st.rerun()
+        elif submit_button and user_input.strip():
             with st.spinner("🤔 AI is thinking..."):
                 try:
-                    df = st.session_state.get("df", None)
-                    reply = ask_groq_api(user_input, df=df)
+                    stats = {"cache": cache_state}
+                    reply = ask_groq_api(user_input, df=df, stats=stats, history_messages=history_messages)
+                    store_answer(cache_key, reply, stats)
                     
                     # Add to chat history
                     timestamp = datetime.now().strftime("%H:%M:%S")
-                    st.session_state.chat_history.append((user_input, reply, timestamp))
+                    add_turn(user_input, reply, timestamp, stats)
                     
                     # Clear the input
                     st.session_state.current_question = ""
@@ -349,8 +669,7 @@ if GROQ_API_KEY:
         # Info cards
         st.markdown("### 📊 Quick Stats")
         
-        if st.session_state.df is not None:
-            df = st.session_state.df
+        if df is not None:
             
             # Dataset metrics
             col_metric1, col_metric2 = st.columns(2)
@@ -375,6 +694,24 @@ if GROQ_API_KEY:
         # Chat statistics
         st.markdown("### 💬 Chat Statistics")
         st.metric("Total Questions", len(st.session_state.chat_history))
+        ttfts = [stats["ttft"] for *_, stats in st.session_state.chat_history if stats.get("ttft") is not None]
+        if ttfts:
+            st.metric("Avg Time to First Token", f"{sum(ttfts) / len(ttfts):.2f}s")
+        coalescing = coalescing_stats()
+        if coalescing["coalesced"]:
+            st.caption(f"🔗 {coalescing['coalesced']:,} duplicate API calls avoided across sessions "
+                       f"({coalescing['dedup_rate']:.0%} of requests)")
+        if remember_chat and st.session_state.chat_history:
+            st.caption(st.session_state.memory.describe(st.session_state.chat_history, memory_budget))
+        cache_stats = st.session_state.cache_stats
+        if cache_stats["lookups"]:
+            col_cache1, col_cache2 = st.columns(2)
+            with col_cache1:
+                st.metric("Cache Hit Rate", f"{cache_stats['hits'] / cache_stats['lookups']:.0%}")
+            with col_cache2:
+                st.metric("Latency Saved", f"{cache_stats['saved']:.1f}s")
+            shared = get_response_cache().stats()
+            st.caption(f"💾 {shared['entries']:,} cached answers ({shared['bytes'] / 1024:.0f} KB) shared across sessions")
         
         # Tips
         st.markdown("""
@@ -394,3 +731,5 @@ else:
     3. Add to Secrets: `GROQ_API_KEY = "your_key_here"`
     4. Reboot the application
     """)
+
+show_trace_panel()
@@ -0,0 +1,107 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from utils.lazy import px, start_warmup
+from utils.telemetry import LATENCY_COLUMNS, estimate_cost, get_telemetry, percentile_table
+
+st.set_page_config(page_title="LLM Telemetry", page_icon="📈", layout="wide")
+start_warmup()
+
+WINDOWS = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400,
+           "Last 30 days": 30 * 86400, "All time": None}
+KINDS = ["chat", "prefetch", "summary"]
+
+
+def show_overview(df):
+    """Headline numbers for the selected window"""
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("📨 Requests", f"{len(df):,}")
+    hits = (df['cache'] == 'hit').sum()
+    lookups = df['cache'].isin(['hit', 'miss']).sum()
+    col2.metric("💾 Cache Hit Rate", f"{hits / lookups:.0%}" if lookups else "-")
+    col3.metric("🔤 Tokens", f"{int(df['prompt_tokens'].fillna(0).sum() + df['completion_tokens'].fillna(0).sum()):,}")
+    col4.metric("💵 Est. Cost", f"${df['cost'].sum():.4f}")
+    col5.metric("❌ Errors", f"{int(df['error'].sum()):,}")
+
+
+def show_percentiles(df, by, title):
+    st.subheader(title)
+    table = percentile_table(df, by)
+    tokens = df.groupby(by, dropna=False).agg(
+        prompt_tokens_p50=('prompt_tokens', 'median'),
+        context_tokens_p95=('context_tokens', lambda s: s.quantile(0.95)),
+        completion_tokens_p50=('completion_tokens', 'median'),
+        cost=('cost', 'sum'),
+    ).reset_index()
+    table = table.merge(tokens, on=by, how='left')
+    st.dataframe(table.round(1), use_container_width=True, hide_index=True)
+
+
+def show_trends(df, bucket):
+    """Request volume and latency percentiles over time"""
+    grouped = df.set_index('time').groupby([pd.Grouper(freq=bucket), 'model'])
+    trend = grouped['total_ms'].quantile(0.95).rename('p95 total (ms)').reset_index()
+    trend['requests'] = grouped.size().to_numpy()
+
+    fig = px.line(trend, x='time', y='p95 total (ms)', color='model', markers=True,
+                  title='⏱️ p95 total latency')
+    fig.update_layout(height=350, margin=dict(l=10, r=10, t=50, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+    fig = px.bar(trend, x='time', y='requests', color='model', title='📨 Requests')
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=50, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def show_breakdown(df):
+    """Where the time goes, per model (medians)"""
+    parts = df.groupby('model')[['context_ms', 'queue_ms', 'network_ms']].median().reset_index()
+    parts = parts.melt(id_vars='model', var_name='stage', value_name='median ms')
+    fig = px.bar(parts, x='model', y='median ms', color='stage', title='🧩 Latency breakdown (median)')
+    fig.update_layout(height=350, margin=dict(l=10, r=10, t=50, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+    fig = px.histogram(df, x='prompt_tokens', color='model', nbins=40, title='🔤 Prompt tokens per request')
+    fig.update_layout(height=350, margin=dict(l=10, r=10, t=50, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def main():
+    st.title("📈 LLM Telemetry")
+
+    st.sidebar.header("Filters")
+    window = st.sidebar.selectbox("Time Window", list(WINDOWS), index=1)
+    kinds = st.sidebar.multiselect("Request Kinds", KINDS, default=KINDS)
+    bucket = st.sidebar.selectbox("Trend Bucket", ["5min", "h", "D"], index=1,
+                                  format_func={"5min": "5 minutes", "h": "Hour", "D": "Day"}.get)
+
+    since = time.time() - WINDOWS[window] if WINDOWS[window] else None
+    df = get_telemetry().frame(since=since, kinds=kinds)
+    if df.empty:
+        st.info("📭 No requests recorded in this window yet. Ask the AI Assistant something first.")
+        return
+    df['cost'] = estimate_cost(df)
+    df['model'] = df['model'].fillna('unknown')
+    df['dataset_label'] = df['dataset_label'].fillna('no dataset')
+
+    show_overview(df)
+    answered = df[df['cache'] != 'hit']
+    show_percentiles(df, 'model', "🧠 Latency percentiles by model (ms)")
+    show_percentiles(df, 'dataset_label', "📊 Latency percentiles by dataset (ms)")
+
+    if not answered.empty:
+        show_trends(answered, bucket)
+        show_breakdown(answered)
+
+    with st.expander("🗂️ Raw requests"):
+        recent = df.sort_values('ts', ascending=False)
+        st.dataframe(recent.drop(columns=['id', 'ts']).head(500), use_container_width=True, hide_index=True)
+        st.download_button("📄 Download CSV", recent.to_csv(index=False), "llm_telemetry.csv", "text/csv")
+
+    st.caption("Cache hits are excluded from the trend and breakdown charts. Costs use list prices "
+               "from utils/telemetry.py and are estimates. Columns: " + ", ".join(LATENCY_COLUMNS))
+
+
+main()
@@ -0,0 +1,112 @@
+import streamlit as st
+
+from utils.data_loader import current_dataset
+from utils.lazy import start_warmup
+from utils.perf import begin_rerun, show_trace_panel
+from utils.sql_engine import DEFAULT_QUERY, MAX_FETCH_ROWS, PAGE_SIZES, QueryResult
+
+st.set_page_config(page_title="SQL Console", page_icon="🦆", layout="wide")
+
+EXAMPLES = {
+    "Preview": "SELECT * FROM data LIMIT 1000",
+    "Row count by column value": "SELECT {col}, count(*) AS rows FROM data GROUP BY ALL ORDER BY rows DESC",
+    "Summary of every column": "SUMMARIZE data",
+    "Whole uploaded file": "SELECT count(*) AS rows FROM file",
+}
+
+
+def show_tables(df, info):
+    """What the queries can read from"""
+    st.sidebar.header("🗂️ Tables")
+    st.sidebar.markdown(f"**`data`** — current dataset, {len(df):,} rows × {len(df.columns)} columns")
+    source = info.get("source") if info else None
+    if source is not None:
+        note = " (every row, including those left out of the loaded sample)" if info.get("sample_fraction") else ""
+        st.sidebar.markdown(f"**`file`** — {source.name} read straight from disk{note}")
+    else:
+        st.sidebar.caption("`file` is available for CSV and JSON uploads.")
+    with st.sidebar.expander("🏷️ Columns"):
+        st.dataframe(df.dtypes.astype(str).rename("type"), use_container_width=True)
+
+
+def run_query(sql, df, info, page_size):
+    """Start a query and keep it in the session so later pages stream from the same result"""
+    previous = st.session_state.get("sql_result")
+    if previous is not None:
+        previous.close()
+    source = info.get("source") if info else None
+    st.session_state.sql_result = None
+    st.session_state.sql_page = 0
+    try:
+        st.session_state.sql_result = QueryResult(sql, df=df, source_path=source.path if source else None,
+                                                  page_size=page_size)
+    except Exception as e:
+        st.error(f"❌ {e}")
+
+
+def show_result(result):
+    """Current page, navigation and query stats"""
+    page = st.session_state.get("sql_page", 0)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("⏱️ Query Time", f"{result.seconds * 1000:,.0f} ms",
+                help=f"First page after {result.first_page_seconds * 1000:,.0f} ms")
+    col2.metric("📥 Rows Scanned", f"{result.rows_scanned:,}" if result.done else "…",
+                help="Rows the table scans produced, after filters pushed into the scan. Known once every "
+                     "page has been fetched.")
+    col3.metric("📄 Rows Fetched", f"{result.rows_fetched:,}" + ("" if result.done else "+"))
+    col4.metric("📑 Page", f"{page + 1} / {len(result.pages)}" + ("" if result.done else "+"))
+
+    st.dataframe(result.pages[page], use_container_width=True, hide_index=True)
+
+    nav1, nav2, nav3, nav4 = st.columns(4)
+    if nav1.button("⏮️ Previous", disabled=page == 0, use_container_width=True):
+        st.session_state.sql_page = page - 1
+        st.rerun()
+    last_fetched = page == len(result.pages) - 1
+    if nav2.button("⏭️ Next", disabled=last_fetched and result.done, use_container_width=True):
+        if not last_fetched or result.fetch_page() is not None:
+            st.session_state.sql_page = page + 1
+        st.rerun()
+    capped = result.rows_fetched >= MAX_FETCH_ROWS
+    if nav3.button("⏬ Fetch All", disabled=result.done or capped, use_container_width=True):
+        while result.rows_fetched < MAX_FETCH_ROWS and result.fetch_page() is not None:
+            pass
+        st.session_state.sql_page = len(result.pages) - 1
+        st.rerun()
+    if capped and not result.done:
+        st.caption(f"Fetching stopped at {MAX_FETCH_ROWS:,} rows; add a LIMIT or aggregate to see the rest.")
+    nav4.download_button("📄 Download Fetched Rows", result.frame().to_csv(index=False), "query_result.csv",
+                         "text/csv", use_container_width=True)
+
+
+def main():
+    st.title("🦆 SQL Console")
+    df, info = current_dataset()
+    if df is None:
+        st.warning("⚠️ Upload data first")
+        return
+
+    show_tables(df, info)
+    page_size = st.sidebar.selectbox("📄 Rows per Page", PAGE_SIZES, index=PAGE_SIZES.index(1000))
+
+    with st.expander("💡 Example queries"):
+        first = next(iter(df.columns), "column")
+        for label, example in EXAMPLES.items():
+            st.markdown(f"**{label}**")
+            st.code(example.format(col=f'"{first}"'), language="sql")
+
+    with st.form("sql_form"):
+        sql = st.text_area("Query", value=DEFAULT_QUERY, height=160, key="sql_text")
+        submitted = st.form_submit_button("▶️ Run Query", type="primary")
+    if submitted and sql.strip():
+        run_query(sql, df, info, page_size)
+
+    result = st.session_state.get("sql_result")
+    if result is not None:
+        show_result(result)
+
+
+start_warmup()
+begin_rerun("SQL Console")
+main()
+show_trace_panel()
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from utils.groupby import GroupIndex
+from utils.query_plan import run_plan
+
+
+def test_count_skips_missing_values():
+    df = pd.DataFrame({'v': [1.0, np.nan, 3.0], 'g': ['a', 'a', 'b']})
+    index = GroupIndex(df, ['g'])
+    assert index.aggregate(df['v'].to_numpy(), 'count').tolist() == [1, 1]
+    assert index.aggregate(None, 'count').tolist() == [2, 1]
+
+
+def test_grouped_count_matches_ungrouped():
+    df = pd.DataFrame({'v': [1.0, np.nan, 3.0], 'g': ['a', 'a', 'b']})
+    count = {'aggregations': [{'column': 'v', 'func': 'count'}]}
+    total, _ = run_plan(df, count)
+    grouped, _ = run_plan(df, dict(count, group_by=['g']))
+    assert grouped['count(v)'].sum() == total['count(v)'].iloc[0] == 2
@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+import pytest
+
+from utils.query_plan import QueryPlanError, query_tool_handler, run_plan
+
+
+@pytest.fixture
+def orders():
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-05', '2024-02-10', '2024-03-15']),
+        'amount': [10.0, 20.0, 30.0],
+    })
+
+
+def test_date_filter(orders):
+    result, matched = run_plan(orders, {'filters': [{'column': 'date', 'op': '>=', 'value': '2024-02-01'}]})
+    assert matched == 2
+    assert result['amount'].tolist() == [20.0, 30.0]
+
+
+@pytest.mark.parametrize('value', ['last month', {'from': '2024-01-01'}, ['2024-01-05', 'yesterday']])
+def test_unparseable_date_is_a_plan_error(orders, value):
+    op = 'in' if isinstance(value, list) else '>='
+    with pytest.raises(QueryPlanError, match="Bad date for 'date'"):
+        run_plan(orders, {'filters': [{'column': 'date', 'op': op, 'value': value}]})
+
+
+def test_tool_handler_reports_bad_date(orders):
+    log = []
+    handle = query_tool_handler(orders, log)
+    output = handle('run_query', json.dumps({'filters': [{'column': 'date', 'op': '>', 'value': 'last month'}]}))
+    assert output.startswith("Error: Bad date for 'date'")
+    assert log[0]['output'] == output
+
+
+@pytest.fixture
+def labelled():
+    return pd.DataFrame({'s': ['x', None, 'y', 'x'], 'g': ['a', 'a', 'b', 'b']})
+
+
+def test_count_text_column(labelled):
+    result, _ = run_plan(labelled, {'aggregations': [{'column': 's', 'func': 'count'}]})
+    assert result['count(s)'].tolist() == [3]
+
+
+def test_count_text_column_by_group(labelled):
+    result, _ = run_plan(labelled, {'group_by': ['g'], 'aggregations': [{'column': 's', 'func': 'count'}]})
+    assert dict(zip(result['g'], result['count(s)'])) == {'a': 1, 'b': 2}
+
+
+def test_tool_handler_reports_value_errors(orders, monkeypatch):
+    def fail(df, plan):
+        raise ValueError("could not convert string to float: 'x'")
+    monkeypatch.setattr('utils.query_plan.run_plan', fail)
+    output = query_tool_handler(orders)('run_query', '{}')
+    assert output == "Error: could not convert string to float: 'x'"
@@ -0,0 +1,120 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+PALETTE = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF']
+# Rendered chart width; LTTB keeps about two points per horizontal pixel
+CHART_WIDTH_PX = 1200
+POINTS_PER_PIXEL = 2
+# Keeps the serialized figure well under ~1 MB across all traces
+MAX_PAYLOAD_POINTS = 20000
+
+
+def point_budget(n_traces, width_px=CHART_WIDTH_PX):
+    """Points per trace: pixel-proportional, capped by the total payload budget"""
+    return max(3, min(width_px * POINTS_PER_PIXEL, MAX_PAYLOAD_POINTS // max(1, n_traces)))
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling; returns indices of kept points"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.append(edges, n)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_series(x, y, n_out):
+    """Drop NaNs and downsample one series with LTTB"""
+    y = np.asarray(y, dtype=float)
+    mask = ~np.isnan(y)
+    x, y = np.asarray(x)[mask], y[mask]
+    x_num = x.astype('int64') if np.issubdtype(x.dtype, np.datetime64) else x
+    keep = lttb(x_num, y, n_out)
+    return x[keep], y[keep]
+
+
+def trend_figure(df, columns, window=None, x=None):
+    """WebGL line chart of the given columns, downsampled to the point budget"""
+    x = np.arange(len(df)) if x is None else np.asarray(x)
+    lo, hi = window if window else (0, len(df) - 1)
+
+    budget = point_budget(len(columns))
+    fig = go.Figure()
+    shown = 0
+    for col in columns:
+        values = df[col].iloc[lo:hi + 1].to_numpy(dtype=float, na_value=np.nan)
+        xs, ys = downsample_series(x[lo:hi + 1], values, budget)
+        shown += len(xs)
+        fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', name=str(col)))
+
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10),
+                      legend=dict(orientation='h', y=1.1))
+    return fig, shown
+
+
+def histogram_figure(df, columns, colors):
+    """Histograms binned server-side so the payload doesn't grow with row count"""
+    rows = (len(columns) + 1) // 2
+    fig = make_subplots(rows=rows, cols=2, subplot_titles=[f'✨ {c}' for c in columns])
+    for i, col in enumerate(columns):
+        values = df[col].to_numpy(dtype=float, na_value=np.nan)
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=25)
+        fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, name=str(col),
+                             marker_color=colors[i % len(colors)], showlegend=False),
+                      row=i // 2 + 1, col=i % 2 + 1)
+    fig.update_layout(height=350 * rows, bargap=0.05, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+def top_values_figure(series, colors, top=8):
+    """Bar chart of the most frequent values of a column"""
+    top_values = series.value_counts().head(top)
+    fig = go.Figure(go.Bar(x=[str(v) for v in top_values.index], y=top_values.values,
+                           marker_color=[colors[j % len(colors)] for j in range(len(top_values))],
+                           text=[f'{v:,}' for v in top_values.values], textposition='outside'))
+    fig.update_layout(title=f'🎯 Top Values: {series.name}', yaxis_title='Count', height=450,
+                      margin=dict(l=10, r=10, t=50, b=10))
+    return fig
+
+
+@st.fragment
+def show_trend_chart(df, candidates, x=None):
+    """Zoomable trend chart; zooming re-queries the window at full resolution budget"""
+    if len(df) < 2:
+        st.info("Not enough rows for a trend chart.")
+        return
+
+    columns = st.multiselect("📈 Trend columns", candidates, default=candidates[:3])
+    if not columns:
+        return
+
+    lo, hi = st.slider("🔎 Zoom window (rows)", 0, len(df) - 1, (0, len(df) - 1),
+                       help="Narrow the window to see it at higher resolution")
+    fig, shown = trend_figure(df, columns, window=(lo, hi), x=x)
+    st.plotly_chart(fig, use_container_width=True)
+
+    total = (hi - lo + 1) * len(columns)
+    payload_kb = len(fig.to_json()) / 1024
+    st.caption(f"Showing {shown:,} of {total:,} points (LTTB) • payload ≈ {payload_kb:,.0f} KB")
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils.llm_client import RateLimitTimeout, complete_chat
+from utils.llm_context import CHARS_PER_TOKEN, estimate_tokens
+from utils.telemetry import record_request
+
+DEFAULT_MEMORY_BUDGET = 1000
+# Newest turns kept verbatim; older ones are folded into the summary
+RECENT_TURNS = 4
+# Share of the memory budget the summary may take
+SUMMARY_SHARE = 0.4
+SUMMARY_MAX_TOKENS = 300
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a data analysis assistant. "
+    "Merge the new turns into the current summary. Keep facts, numbers, column names, filters and "
+    "decisions the user may refer back to; drop pleasantries. Reply with the summary only, under 150 words."
+)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+
+def clip_to_tokens(text, tokens):
+    """Cut text to roughly ``tokens`` tokens"""
+    limit = max(0, tokens) * CHARS_PER_TOKEN
+    return text if len(text) <= limit else text[:max(0, limit - 1)] + "…"
+
+
+def _turn_text(question, answer):
+    return f"User: {question}\nAssistant: {answer}"
+
+
+class ConversationMemory:
+    """Recent turns verbatim plus a rolling summary of everything older, within a token budget
+
+    ``history`` is the page's list of (question, answer, timestamp, stats)
+    tuples; the summary is refreshed on a background thread and picked up
+    on a later run, so no request ever waits for it.
+    """
+
+    def __init__(self):
+        self.summary = ""
+        self.summarized = 0
+        self._job = None
+        self._generation = 0
+
+    def reset(self):
+        self.summary = ""
+        self.summarized = 0
+        self._job = None
+        self._generation += 1
+
+    def refresh(self, history, api_key, model):
+        """Collect a finished summary and start the next one if old turns are waiting"""
+        if len(history) < self.summarized:
+            self.reset()
+        if self._job is not None:
+            future, generation, upto = self._job
+            if not future.done():
+                return
+            self._job = None
+            # None means the summary could not be made now; an empty one still covers its turns
+            if generation == self._generation and future.exception() is None and future.result() is not None:
+                self.summary = future.result().strip()
+                self.summarized = upto
+
+        upto = len(history) - RECENT_TURNS
+        if upto > self.summarized:
+            turns = [_turn_text(q, a) for q, a, _, stats in history[self.summarized:upto] if not stats.get("error")]
+            if not turns:
+                # Only failed turns: nothing to summarize, so don't start a job for them on every run
+                self.summarized = upto
+                return
+            future = _executor.submit(self._summarize, self.summary, turns, api_key, model)
+            self._job = (future, self._generation, upto)
+
+    @staticmethod
+    def _summarize(summary, turns, api_key, model):
+        if not turns:
+            return summary
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n" + "\n\n".join(turns)}
+            ],
+            "temperature": 0,
+            "max_tokens": SUMMARY_MAX_TOKENS
+        }
+        stats = {}
+        try:
+            # Background budget only; if it is spent the turns stay pending and are retried next run
+            summary = complete_chat(payload, api_key, stats=stats, background=True)
+        except RateLimitTimeout:
+            return None
+        except (requests.exceptions.RequestException, KeyError, IndexError):
+            record_request('summary', dict(stats, error=True), model)
+            return None
+        record_request('summary', stats, model)
+        return summary
+
+    @property
+    def pending(self):
+        return self._job is not None
+
+    def messages(self, history, budget=DEFAULT_MEMORY_BUDGET):
+        """Chat messages carrying the conversation so far, never more than ``budget`` tokens"""
+        if budget <= 0 or not history:
+            return []
+        used = 0
+        head = []
+        if self.summary and self.summarized:
+            text = "Summary of the earlier conversation:\n" + clip_to_tokens(self.summary, int(budget * SUMMARY_SHARE))
+            head = [{"role": "system", "content": text}]
+            used += estimate_tokens(text)
+
+        turns = []
+        for question, answer, _, stats in reversed(history[self.summarized:]):
+            if stats.get("error"):
+                continue
+            cost = estimate_tokens(question) + estimate_tokens(answer)
+            if used + cost > budget:
+                if not turns:
+                    # Always keep the latest exchange, shortened to fit
+                    room = budget - used - estimate_tokens(question)
+                    if room > 20:
+                        turns.append((question, clip_to_tokens(answer, room)))
+                break
+            turns.append((question, answer))
+            used += cost
+
+        body = []
+        for question, answer in reversed(turns):
+            body += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+        return head + body
+
+    def describe(self, history, budget=DEFAULT_MEMORY_BUDGET):
+        """Short status line for the UI"""
+        messages = self.messages(history, budget)
+        verbatim = sum(1 for m in messages if m["role"] == "user")
+        tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        note = f"🧠 {verbatim} recent turns"
+        if self.summarized:
+            note += f" + summary of {self.summarized} earlier"
+        note += f" (~{tokens} / {budget} tokens)"
+        if self.pending:
+            note += " • summarizing…"
+        return note
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+from utils.paths import data_path
+
+PAGE_SIZE = 10
+SEARCH_LIMIT = 20
+# Lets "search all chats" cover every browser's chats, not only the searcher's own
+SHARED_SEARCH = os.getenv("APP_SHARED_CHAT_SEARCH", "0") == "1"
+
+
+def new_session_id():
+    return uuid.uuid4().hex[:12]
+
+
+def new_owner_token():
+    """Secret identifying one browser; chats are only readable with their owner's token"""
+    return uuid.uuid4().hex
+
+
+def fts_query(text):
+    """Turn free text into a safe FTS5 query: every word must match, as a prefix"""
+    words = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class ChatStore:
+    """Chat turns in SQLite, indexed by session, dataset and time, with full-text search"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("chat_history.sqlite")
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    owner TEXT,
+                    dataset TEXT,
+                    created REAL NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    stats TEXT
+                );
+                CREATE INDEX IF NOT EXISTS turns_session ON turns (session_id, created);
+                CREATE INDEX IF NOT EXISTS turns_dataset ON turns (dataset, created);
+                CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+                    question, answer, content='turns', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+                    INSERT INTO turns_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+                END;
+                CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+                    INSERT INTO turns_fts (turns_fts, rowid, question, answer)
+                    VALUES ('delete', old.id, old.question, old.answer);
+                END;
+            """)
+            self._migrate(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS turns_owner ON turns (owner, created)")
+
+    @staticmethod
+    def _migrate(conn):
+        """Add the owner column to stores created before chats had owners; their turns stay unowned"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(turns)")}
+        if 'owner' not in columns:
+            conn.execute("ALTER TABLE turns ADD COLUMN owner TEXT")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def add(self, session_id, owner, question, answer, stats=None, dataset=None, created=None):
+        """Store a turn; returns its id"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO turns (session_id, owner, dataset, created, question, answer, stats) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, owner, dataset, created or time.time(), question, answer,
+                 json.dumps(stats or {}, default=str))
+            )
+            return cursor.lastrowid
+
+    def count(self, session_id, owner):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM turns WHERE session_id = ? AND owner = ?",
+                                (session_id, owner)).fetchone()[0]
+
+    def owned_by_other(self, session_id, owner):
+        """Whether a chat id already holds turns of a different owner"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM turns WHERE session_id = ? AND owner IS NOT ? LIMIT 1",
+                                (session_id, owner)).fetchone() is not None
+
+    def turns(self, session_id, owner, offset=0, limit=None):
+        """Turns of a session, oldest first, as (question, answer, created, stats); empty for other owners"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT question, answer, created, stats FROM turns WHERE session_id = ? AND owner = ? "
+                "ORDER BY created, id LIMIT ? OFFSET ?",
+                (session_id, owner, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [(q, a, created, json.loads(stats or '{}')) for q, a, created, stats in rows]
+
+    def search(self, text, owner=None, session_id=None, dataset=None, limit=SEARCH_LIMIT):
+        """Best matches for free text in past questions and answers, with a highlighted snippet
+
+        ``owner=None`` searches every owner's chats, for SHARED_SEARCH only.
+        """
+        query = fts_query(text)
+        if not query:
+            return []
+        sql = ("SELECT t.session_id, t.created, t.question, snippet(turns_fts, -1, '**', '**', '…', 12) "
+               "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid WHERE turns_fts MATCH ?")
+        params = [query]
+        if owner is not None:
+            sql += " AND t.owner = ?"
+            params.append(owner)
+        if session_id is not None:
+            sql += " AND t.session_id = ?"
+            params.append(session_id)
+        if dataset is not None:
+            sql += " AND t.dataset = ?"
+            params.append(dataset)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [{'session_id': s, 'created': c, 'question': q, 'snippet': snip} for s, c, q, snip in rows]
+
+    def clear(self, session_id, owner):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM turns WHERE session_id = ? AND owner = ?", (session_id, owner))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chat_store():
+    """The shared chat store for this server process"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChatStore()
+        return _store
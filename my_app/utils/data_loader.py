@@ -0,0 +1,138 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pandas as pd
+import streamlit as st
+
+from utils.memory import get_governor
+from utils.timeseries import parse_datetime_columns
+from utils.tracing import span
+
+FILE_TYPES = {'.csv': 'CSV', '.xlsx': 'Excel', '.xls': 'Excel', '.json': 'JSON'}
+UPLOAD_TYPES = [ext.lstrip('.') for ext in FILE_TYPES]
+# Formats the SQL console can read straight from the uploaded file
+SOURCE_TYPES = {'.csv', '.json'}
+# Rows per chunk when sampling a CSV too large to load whole
+SAMPLE_CHUNK_ROWS = 200_000
+SAMPLE_SEED = 0
+
+
+def content_digest(data):
+    """Hash of the raw file bytes; the same file uploaded twice gives the same digest"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def read_frame(data, name, sample_fraction=None):
+    """Parse file bytes by extension and convert text date columns
+
+    With ``sample_fraction`` a CSV is read in chunks keeping that share of rows, so the full file is never
+    in memory at once.
+    """
+    ext = os.path.splitext(name.lower())[1]
+    buffer = BytesIO(data)
+    with span("ingest.parse", file=name, bytes=len(data)):
+        if ext == '.csv' and sample_fraction:
+            chunks = pd.read_csv(buffer, chunksize=SAMPLE_CHUNK_ROWS)
+            df = pd.concat([chunk.sample(frac=sample_fraction, random_state=SAMPLE_SEED + i)
+                            for i, chunk in enumerate(chunks)]).sort_index()
+        elif ext == '.csv':
+            df = pd.read_csv(buffer)
+        elif ext in ('.xls', '.xlsx'):
+            df = pd.read_excel(buffer)
+        elif ext == '.json':
+            df = pd.read_json(buffer)
+        else:
+            raise ValueError(f"Unsupported file format: {ext or name}")
+    with span("ingest.dates"):
+        return parse_datetime_columns(df)
+
+
+def _parse_governed(digest, name, data):
+    """Handle for a file's frame, shared with any session that uploaded the same content
+
+    Files that would not fit the per-dataset memory limit are downsampled (CSV) or refused with
+    ``DatasetTooLarge``.
+    """
+    governor = get_governor()
+    handle = governor.lookup(digest)
+    if handle is not None:
+        return handle
+    action, fraction = governor.plan_upload(len(data), name)
+    df, date_formats = read_frame(data, name, sample_fraction=fraction)
+    # The estimate from the file size can be off; trim to the limit if the parsed frame is still too big
+    df, trimmed = governor.fit(df)
+    if trimmed:
+        fraction = (fraction or 1.0) * trimmed
+    ext = os.path.splitext(name.lower())[1]
+    source = governor.keep_source(data, name) if ext in SOURCE_TYPES else None
+    return governor.register(df, name, key=digest, meta={'date_formats': date_formats, 'sample_fraction': fraction,
+                                                         'source': source})
+
+
+def load_upload(uploaded_file):
+    """Make an uploaded file the current dataset, parsing it only if its content is new
+
+    Returns the dataset info dict kept in ``st.session_state["dataset_info"]``. The current dataset is only
+    replaced when a different file is uploaded, so reruns don't undo a cleaned dataset.
+    """
+    with span("ingest.load", file=uploaded_file.name):
+        return _load_upload(uploaded_file)
+
+
+def upload_digest(uploaded_file):
+    """Content digest of an upload, hashed once per uploaded file rather than on every rerun"""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    cached = st.session_state.get("upload_digest")
+    if file_id is not None and cached is not None and cached[0] == file_id:
+        return cached[1]
+    digest = content_digest(uploaded_file.getvalue())
+    st.session_state["upload_digest"] = (file_id, digest)
+    return digest
+
+
+def _load_upload(uploaded_file):
+    digest = upload_digest(uploaded_file)
+    info = st.session_state.get("dataset_info")
+    if info is not None and info["digest"] == digest and st.session_state.get("dataset") is not None:
+        return info
+
+    handle = _parse_governed(digest, uploaded_file.name, uploaded_file.getvalue())
+    info = {
+        'version': handle.version,
+        'digest': digest,
+        'name': uploaded_file.name,
+        'file_type': FILE_TYPES[os.path.splitext(uploaded_file.name.lower())[1]],
+        'size': uploaded_file.size,
+        'date_formats': handle.meta['date_formats'],
+        'sample_fraction': handle.meta['sample_fraction'],
+        'source': handle.meta['source'],
+    }
+    st.session_state["dataset"] = handle
+    st.session_state["dataset_info"] = info
+    return info
+
+
+def set_dataset(df, label=None):
+    """Replace the current frame (e.g. with a cleaned copy), keeping the upload's info"""
+    info = dict(st.session_state.get("dataset_info") or {})
+    handle = get_governor().register(df, label or info.get('name', 'dataset'))
+    info['version'] = handle.version
+    st.session_state["dataset"] = handle
+    st.session_state["dataset_info"] = info
+    return info
+
+
+def has_dataset():
+    return st.session_state.get("dataset") is not None
+
+
+def current_dataset():
+    """The current frame and its info dict, or (None, None) before anything is uploaded
+
+    The frame comes from the memory governor and may have been reloaded from disk, memory-mapped.
+    """
+    handle = st.session_state.get("dataset")
+    if handle is None:
+        return None, st.session_state.get("dataset_info")
+    return handle.get(), st.session_state.get("dataset_info")
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from utils.tracing import span
+
+# Frames up to this size are hashed in full; larger ones by evenly spaced row blocks
+FULL_HASH_ROWS = 100_000
+HASH_BLOCKS = 64
+BLOCK_ROWS = 256
+
+# id(frame) -> (weak reference, version); entries go away with their frame
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def fingerprint(df):
+    """Content hash of a frame: schema, shape and vectorized row hashes (sampled blocks for large frames)"""
+    digest = hashlib.sha256()
+    digest.update(repr((df.shape, list(map(str, df.columns)), list(map(str, df.dtypes)))).encode())
+    if len(df) <= FULL_HASH_ROWS:
+        rows = df
+    else:
+        starts = np.linspace(0, len(df) - BLOCK_ROWS, HASH_BLOCKS).astype(np.int64)
+        rows = df.take((starts[:, None] + np.arange(BLOCK_ROWS)).ravel())
+    digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _forget(key):
+    with _versions_lock:
+        _versions.pop(key, None)
+
+
+def set_version(df, version):
+    """Attach a version to a frame; frames are treated as immutable once versioned"""
+    key = id(df)
+    with _versions_lock:
+        entry = _versions.get(key)
+        if entry is None or entry[0]() is not df:
+            weakref.finalize(df, _forget, key)
+        _versions[key] = (weakref.ref(df), version)
+    return version
+
+
+def dataset_version(df):
+    """Version of a frame: O(1) once known, otherwise fingerprinted on first sight"""
+    if df is None:
+        return "none"
+    with _versions_lock:
+        entry = _versions.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    with span("dataset.fingerprint", rows=len(df)):
+        return set_version(df, fingerprint(df))
+
+
+def derive_version(parent, op, **params):
+    """Deterministic version of a transformed frame from its parent's version and the operation"""
+    spec = json.dumps({'parent': parent, 'op': op, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def tag_derived(df, parent, op, **params):
+    """Version ``df`` as the result of ``op`` applied to the ``parent`` frame, without hashing it"""
+    set_version(df, derive_version(dataset_version(parent), op, **params))
+    return df
@@ -0,0 +1,129 @@
+import pandas as pd
+import numpy as np
+
+from utils.dataset_version import tag_derived
+from utils.tracing import traced
+
+# 'duckdb' runs statistics and group-bys as parallel SQL scans instead of pandas
+BACKENDS = ['pandas', 'duckdb']
+AGGREGATES = ['sum', 'mean', 'count', 'min', 'max']
+
+
+class EDAProcessor:
+    def __init__(self, df, backend='pandas'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.df = df
+        self.backend = backend
+        self.num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+        self.date_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+    
+    @traced("eda.clean")
+    def clean_data(self, strategy='auto'):
+        """Clean data with flexible strategies"""
+        df_clean = self.df.copy()
+        
+        # Numeric columns
+        for col in self.num_cols:
+            if df_clean[col].isnull().any():
+                if strategy == 'median':
+                    df_clean[col] = df_clean[col].fillna(df_clean[col].median())
+                elif strategy == 'mean':
+                    df_clean[col] = df_clean[col].fillna(df_clean[col].mean())
+                else:  # auto
+                    df_clean[col] = df_clean[col].fillna(df_clean[col].median())
+        
+        # Categorical columns
+        for col in self.cat_cols:
+            if df_clean[col].isnull().any() and not df_clean[col].mode().empty:
+                df_clean[col] = df_clean[col].fillna(df_clean[col].mode()[0])
+        
+        # Same input and strategy always give the same version, without rehashing the result
+        return tag_derived(df_clean, self.df, 'clean_data', strategy=strategy)
+    
+    @traced("eda.summary")
+    def get_summary(self):
+        """Get data summary"""
+        return {
+            'shape': self.df.shape,
+            'missing': self.df.isnull().sum().sum(),
+            'dtypes': self.df.dtypes.value_counts().to_dict(),
+            'memory_mb': round(self.df.memory_usage(deep=True).sum() / 1024**2, 2)
+        }
+    
+    @traced("eda.stats")
+    def get_stats(self):
+        """Get statistical information"""
+        stats = {}
+        if self.backend == 'duckdb':
+            from utils.sql_engine import describe_numeric, top_values
+            if self.num_cols:
+                stats['numeric'] = describe_numeric(self.df, self.num_cols)
+            if self.cat_cols:
+                stats['categorical'] = {col: top_values(self.df, col) for col in self.cat_cols[:5]}
+        else:
+            if self.num_cols:
+                stats['numeric'] = self.df[self.num_cols].describe()
+            if self.cat_cols:
+                stats['categorical'] = {col: self.df[col].value_counts().head() for col in self.cat_cols[:5]}
+        if self.date_cols:
+            stats['datetime'] = pd.DataFrame({
+                'Start': self.df[self.date_cols].min(),
+                'End': self.df[self.date_cols].max(),
+                'Span': self.df[self.date_cols].max() - self.df[self.date_cols].min(),
+                'Missing': self.df[self.date_cols].isnull().sum()
+            })
+        return stats
+
+    @traced("eda.aggregate")
+    def aggregate(self, by, measures, agg='sum'):
+        """One row per group with the aggregate of each measure (or a row count), largest first"""
+        if self.backend == 'duckdb':
+            from utils.sql_engine import group_aggregate
+            return group_aggregate(self.df, by, measures, agg)
+        grouped = self.df.groupby(by, dropna=False)
+        if agg == 'count':
+            result = grouped.size().rename('count').reset_index()
+        else:
+            result = grouped[measures].agg(agg)
+            result.columns = [f'{agg}({col})' for col in measures]
+            result = result.reset_index()
+        # Stable sort keeps tied groups in key order
+        return result.sort_values(result.columns[len(by)], ascending=False, kind='stable').reset_index(drop=True)
+
+
+def data_quality(df, num_cols):
+    """Headline quality numbers shown as the dashboard's insight cards"""
+    total_cells = len(df) * len(df.columns)
+    missing_cells = int(df.isnull().sum().sum())
+    quality = {
+        'quality_score': round((1 - missing_cells / total_cells) * 100, 1) if total_cells else 100.0,
+        'complete_records': len(df.dropna()),
+        'missing_cells': missing_cells,
+        'numeric_features': len(num_cols),
+    }
+    if num_cols:
+        quality['average_mean'] = round(df[num_cols].mean().mean(), 2)
+        quality['total_variance'] = round(df[num_cols].var().sum(), 2)
+    return quality
+
+
+def correlation_strength(r):
+    return ('🔥 Very Strong' if abs(r) > 0.8 else '💪 Strong' if abs(r) > 0.6 else
+            '👍 Moderate' if abs(r) > 0.3 else '👌 Weak')
+
+
+@traced("correlation.top_pairs")
+def top_correlations(corr, n=10):
+    """Strongest feature pairs from the upper triangle of a correlation matrix"""
+    upper = np.triu_indices(len(corr.columns), k=1)
+    values = corr.to_numpy()[upper]
+    pairs = pd.DataFrame({
+        'Feature 1': corr.columns[upper[0]],
+        'Feature 2': corr.columns[upper[1]],
+        'Correlation': np.round(values, 3),
+    })
+    pairs = pairs.dropna(subset=['Correlation']).sort_values('Correlation', key=abs, ascending=False).head(n)
+    pairs['Strength'] = pairs['Correlation'].map(correlation_strength)
+    return pairs.reset_index(drop=True)
@@ -0,0 +1,153 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dataset_version import dataset_version
+from utils.lazy import px
+
+AGGREGATES = ['sum', 'mean', 'count', 'min', 'max']
+# Combined keys up to this size are compacted with a bincount instead of a sort
+DENSE_KEY_LIMIT = 10_000_000
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def factorize_column(version, column, _series):
+    """Integer group codes (-1 for missing) and unique labels for one dimension of a dataset version"""
+    codes, uniques = pd.factorize(_series, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques, name=column)
+
+
+class GroupIndex:
+    """Dense group ids for one or more dimensions, built from cached per-column codes"""
+
+    def __init__(self, df, dims):
+        self.dims = list(dims)
+        version = dataset_version(df)
+        factorized = [factorize_column(version, dim, df[dim]) for dim in self.dims]
+        cardinalities = [max(len(uniques), 1) for _, uniques in factorized]
+
+        n_keys = int(np.prod(cardinalities, dtype=object))
+        if n_keys >= 2 ** 63:
+            raise ValueError("Too many dimension combinations to group by")
+
+        # Mixed-radix combination of the per-column codes
+        combined = np.zeros(len(df), dtype=np.int64)
+        valid = np.ones(len(df), dtype=bool)
+        for (codes, _), size in zip(factorized, cardinalities):
+            combined = combined * size + codes
+            valid &= codes >= 0
+
+        keys = combined[valid]
+        if n_keys <= DENSE_KEY_LIMIT:
+            present = np.bincount(keys, minlength=n_keys) > 0
+            key_values = np.flatnonzero(present)
+            dense = (np.cumsum(present) - 1)[keys]
+        else:
+            key_values, dense = np.unique(keys, return_inverse=True)
+
+        self.ids = np.full(len(df), -1, dtype=np.int64)
+        self.ids[valid] = dense
+        self.n_groups = len(key_values)
+        self._order = None
+
+        # Decode each group key back into its dimension labels
+        labels = {}
+        remainder = key_values
+        for dim, (_, uniques), size in reversed(list(zip(self.dims, factorized, cardinalities))):
+            remainder, code = np.divmod(remainder, size)
+            labels[dim] = uniques.take(code)
+        self.labels = pd.DataFrame({dim: labels[dim] for dim in self.dims})
+
+    def restrict(self, mask):
+        """Same groups with rows outside ``mask`` left ungrouped; the codes are not rebuilt"""
+        restricted = copy.copy(self)
+        restricted.ids = np.where(mask, self.ids, -1)
+        restricted._order = None
+        return restricted
+
+    def group_sizes(self):
+        return np.bincount(self.ids[self.ids >= 0], minlength=self.n_groups)
+
+    def _sorted(self):
+        """Row order grouped by id, computed once for min/max"""
+        if self._order is None:
+            order = np.argsort(self.ids, kind='stable')
+            order = order[self.ids[order] >= 0]
+            starts = np.flatnonzero(np.r_[True, np.diff(self.ids[order]) != 0])
+            self._order = (order, starts)
+        return self._order
+
+    def aggregate(self, values, agg):
+        """Aggregate a numeric measure per group; ``count`` of ``None`` counts rows, else present values"""
+        grouped = self.ids >= 0
+        if agg == 'count':
+            if values is not None:
+                grouped &= pd.notna(values)
+            return np.bincount(self.ids[grouped], minlength=self.n_groups)
+
+        v = np.asarray(values, dtype=float)
+        present = grouped & ~np.isnan(v)
+        counts = np.bincount(self.ids[present], minlength=self.n_groups)
+        sums = np.bincount(self.ids[present], weights=v[present], minlength=self.n_groups)
+        if agg == 'sum':
+            return sums
+        if agg == 'mean':
+            return np.divide(sums, counts, out=np.full(self.n_groups, np.nan), where=counts > 0)
+        if agg in ('min', 'max'):
+            order, starts = self._sorted()
+            reducer = np.fmin if agg == 'min' else np.fmax
+            result = np.full(self.n_groups, np.nan)
+            if len(order):
+                # Groups emptied by restrict() have no slice and stay NaN
+                result[self.ids[order[starts]]] = reducer.reduceat(v[order], starts)
+            return result
+        raise ValueError(f"Unknown aggregate: {agg}")
+
+    def table(self, df, measures, agg):
+        """Aggregated table with one row per group"""
+        result = self.labels.copy()
+        if agg == 'count':
+            result['count'] = self.aggregate(None, 'count')
+        for col in measures if agg != 'count' else []:
+            result[f'{agg}({col})'] = self.aggregate(df[col].to_numpy(dtype=float, na_value=np.nan), agg)
+        return result
+
+
+@st.fragment
+def show_pivot_explorer(df, dim_cols, num_cols):
+    """Pick dimensions and measures; regrouping reuses the cached codes"""
+    col1, col2, col3 = st.columns([2, 2, 1])
+    dims = col1.multiselect("🏷️ Dimensions", dim_cols, default=dim_cols[:1])
+    measures = col2.multiselect("📏 Measures", num_cols, default=num_cols[:1])
+    agg = col3.selectbox("🧮 Aggregate", AGGREGATES, key="pivot_agg")
+
+    if not dims:
+        st.info("Pick at least one dimension to group by.")
+        return
+    if agg != 'count' and not measures:
+        st.info("Pick a measure, or use the count aggregate.")
+        return
+
+    try:
+        index = GroupIndex(df, dims)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    table = index.table(df, measures, agg)
+    value_col = table.columns[len(dims)]
+    table = table.sort_values(value_col, ascending=False)
+
+    if len(dims) == 2 and st.toggle("🔀 Show as pivot table"):
+        st.dataframe(table.pivot(index=dims[0], columns=dims[1], values=value_col),
+                     use_container_width=True)
+    else:
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption(f"{index.n_groups:,} groups from {len(df):,} rows")
+
+    top = table.head(20)
+    fig = px.bar(top, x=top[dims].astype(str).agg(' • '.join, axis=1), y=value_col,
+                 labels={'x': ' • '.join(dims)}, title=f'📊 {value_col} by {", ".join(dims)}')
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=50, b=10))
+    st.plotly_chart(fig, use_container_width=True)
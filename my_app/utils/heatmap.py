@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.tracing import span
+
+# Per-cell annotations are only readable up to this many columns
+ANNOTATE_MAX_COLS = 20
+# Beyond this many columns the overview aggregates clusters into blocks
+OVERVIEW_MAX_COLS = 60
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def correlation_matrix(version, columns, _df):
+    """Pairwise correlation of the numeric columns, cached per dataset version and column set"""
+    with span("correlation.matrix", columns=len(columns)):
+        return _df[list(columns)].corr()
+
+
+@st.cache_data(show_spinner=False)
+def clustered_blocks(corr, max_blocks=OVERVIEW_MAX_COLS):
+    """Order columns by hierarchical clustering and split them into contiguous blocks"""
+    columns = corr.columns.tolist()
+    if len(columns) < 3:
+        return columns, [columns]
+
+    from scipy.cluster.hierarchy import fcluster, leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    # Strongly (anti-)correlated columns are close to each other
+    dist = 1 - np.abs(np.nan_to_num(corr.values))
+    dist = np.clip((dist + dist.T) / 2, 0, None)
+    np.fill_diagonal(dist, 0)
+    tree = linkage(squareform(dist, checks=False), method='average')
+
+    order = leaves_list(tree)
+    ordered = [columns[i] for i in order]
+
+    # Flat clusters are contiguous in dendrogram leaf order
+    labels = fcluster(tree, t=min(max_blocks, len(columns)), criterion='maxclust')[order]
+    blocks = []
+    for col, label in zip(ordered, labels):
+        if blocks and blocks[-1][0] == label:
+            blocks[-1][1].append(col)
+        else:
+            blocks.append((label, [col]))
+    return ordered, [cols for _, cols in blocks]
+
+
+@st.cache_data(show_spinner=False)
+def block_means(corr, blocks):
+    """Mean correlation between every pair of column blocks"""
+    position = {col: i for i, col in enumerate(corr.columns)}
+    membership = np.zeros((len(corr.columns), len(blocks)))
+    for j, cols in enumerate(blocks):
+        membership[[position[c] for c in cols], j] = 1.0 / len(cols)
+
+    means = membership.T @ np.nan_to_num(corr.values) @ membership
+    labels = [f"B{i + 1} ({len(cols)})" for i, cols in enumerate(blocks)]
+    return pd.DataFrame(means, index=labels, columns=labels)
+
+
+def heatmap_figure(matrix, title, height=600):
+    """Plotly heatmap; cell annotations are dropped for wide matrices"""
+    annotate = len(matrix.columns) <= ANNOTATE_MAX_COLS
+    fig = go.Figure(go.Heatmap(
+        z=matrix.values,
+        x=[str(c) for c in matrix.columns],
+        y=[str(i) for i in matrix.index],
+        zmin=-1, zmax=1, colorscale='RdBu_r',
+        texttemplate='%{z:.2f}' if annotate else None,
+        hovertemplate='%{y} × %{x}<br>r = %{z:.3f}<extra></extra>',
+    ))
+    fig.update_layout(title=title, height=height, yaxis_autorange='reversed',
+                      margin=dict(l=10, r=10, t=50, b=10))
+    return fig
+
+
+def show_clustered_heatmap(corr):
+    """Clustered heatmap with a block overview and drill-down for wide tables"""
+    ordered, blocks = clustered_blocks(corr)
+
+    if len(ordered) <= OVERVIEW_MAX_COLS:
+        matrix = corr.loc[ordered, ordered]
+        st.plotly_chart(heatmap_figure(matrix, '🔗 Clustered Correlation Matrix'), use_container_width=True)
+        return
+
+    st.caption(f"{len(ordered)} columns grouped into {len(blocks)} clusters; each cell is the mean correlation between two clusters.")
+    overview = block_means(corr, blocks)
+    st.plotly_chart(heatmap_figure(overview, '🔗 Cluster Overview'), use_container_width=True)
+    show_block_drilldown(corr, blocks, overview.index.tolist())
+
+
+@st.fragment
+def show_block_drilldown(corr, blocks, labels):
+    """Full-resolution view of one block pair; reruns only this fragment"""
+    col1, col2 = st.columns(2)
+    row_block = col1.selectbox("🔍 Row cluster", range(len(blocks)), format_func=lambda i: labels[i])
+    col_block = col2.selectbox("🔍 Column cluster", range(len(blocks)), format_func=lambda i: labels[i],
+                               index=row_block)
+
+    matrix = corr.loc[blocks[row_block], blocks[col_block]]
+    title = f'🔬 {labels[row_block]} × {labels[col_block]}'
+    st.plotly_chart(heatmap_figure(matrix, title), use_container_width=True)
@@ -0,0 +1,106 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+from utils.tracing import span
+
+# Imported in the background when the server starts, slowest first
+WARM_MODULES = ['seaborn', 'matplotlib.pyplot', 'scipy.cluster.hierarchy', 'plotly.express', 'pandas', 'duckdb']
+WARMUP_ENABLED = os.getenv("APP_WARMUP", "1") != "0"
+
+# module name -> seconds its first import took in this process
+IMPORT_SECONDS = {}
+
+
+class LazyModule:
+    """Stand-in for a module that is imported, and set up, on first attribute access"""
+
+    def __init__(self, name, setup=None):
+        self._name = name
+        self._setup = setup
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = import_timed(self._name)
+                    if self._setup is not None:
+                        self._setup(module)
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'{' (loaded)' if self.loaded else ''}>"
+
+
+def import_timed(name):
+    """Import a module, recording how long the first import took"""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    with span("import", module=name):
+        module = importlib.import_module(name)
+    IMPORT_SECONDS.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+_styled = False
+
+
+def _style_plots(module):
+    """Dashboard look for matplotlib charts, applied once per process instead of per dashboard"""
+    global _styled
+    if _styled:
+        return
+    _styled = True
+    import_timed('matplotlib.pyplot').style.use('seaborn-v0_8-darkgrid')
+    import_timed('seaborn').set_palette("husl")
+
+
+plt = LazyModule('matplotlib.pyplot', setup=_style_plots)
+sns = LazyModule('seaborn', setup=_style_plots)
+px = LazyModule('plotly.express')
+_LAZY = {'matplotlib.pyplot': plt, 'seaborn': sns, 'plotly.express': px}
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def warm_imports(modules=None):
+    """Import and set up the heavy libraries now, in this thread"""
+    for name in modules or WARM_MODULES:
+        try:
+            if name in _LAZY:
+                _LAZY[name]._load()
+            else:
+                import_timed(name)
+        except Exception:
+            # A library that fails here fails again, with a proper error, where it is used
+            pass
+
+
+def start_warmup(modules=None):
+    """Import and set up the heavy libraries on a background thread, once per server process
+
+    Pages call this first thing, so whichever page the first visitor opens starts it. Returns the thread,
+    or None when disabled with APP_WARMUP=0.
+    """
+    global _warmup
+    if not WARMUP_ENABLED:
+        return None
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = threading.Thread(target=warm_imports, args=(modules,), name="warmup", daemon=True)
+            _warmup.start()
+    return _warmup
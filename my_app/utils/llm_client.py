@@ -0,0 +1,653 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Any OpenAI-compatible endpoint works, e.g. a local mock server for testing
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+REQUEST_TIMEOUT = 30
+
+# Limits per model of the API key (Groq counts each model separately); every session draws from the same buckets
+REQUESTS_PER_MINUTE = int(os.getenv("GROQ_RPM", "30"))
+TOKENS_PER_MINUTE = int(os.getenv("GROQ_TPM", "12000"))
+# Longest a request may wait in the queue before giving up
+MAX_QUEUE_WAIT = float(os.getenv("GROQ_MAX_QUEUE_WAIT", "120"))
+# Share of each bucket that background work (prefetching) must leave for interactive requests
+BACKGROUND_RESERVE = 0.5
+
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+POOL_SIZE = 32
+# Tool-call rounds before the model is made to answer with what it has
+MAX_TOOL_ROUNDS = 3
+
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """Raised when a request would have to queue longer than MAX_QUEUE_WAIT"""
+
+
+def chat_completions_url(base_url=None):
+    return f"{(base_url or GROQ_BASE_URL).rstrip('/')}/chat/completions"
+
+
+def iter_sse_data(lines):
+    """Yield the data payload of each server-sent event from an iterable of lines"""
+    data = []
+    for raw in lines:
+        line = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+        line = line.rstrip('\r')
+
+        # A blank line terminates the event
+        if not line:
+            if data:
+                yield '\n'.join(data)
+                data = []
+            continue
+        if line.startswith(':'):
+            continue
+
+        field, _, value = line.partition(':')
+        if field == 'data':
+            data.append(value[1:] if value.startswith(' ') else value)
+    if data:
+        yield '\n'.join(data)
+
+
+def estimate_request_tokens(payload):
+    """Prompt size (~4 chars per token) plus the completion allowance"""
+    chars = sum(len(str(m.get('content', ''))) for m in payload.get('messages', []))
+    return chars // 4 + int(payload.get('max_tokens') or 0)
+
+
+def parse_duration(value):
+    """Seconds from Groq reset headers such as '7.66s', '1m26.4s' or '250ms'"""
+    if not value:
+        return None
+    units = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills continuously to ``capacity`` units per ``period`` seconds"""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.base_rate = self.capacity / period
+        self.rate = self.base_rate
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.available >= self.capacity:
+            self.rate = self.base_rate
+
+    def sync(self, remaining, reset, now):
+        """Adopt the server's remaining budget; with ``reset`` (seconds until full) refill on its schedule"""
+        self.refill(now)
+        self.available = min(self.available, remaining)
+        if reset:
+            self.rate = max(self.capacity - self.available, 0.0) / reset or self.base_rate
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` units are available (requests above capacity wait for a full bucket)"""
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount):
+        self.available -= min(amount, self.capacity)
+
+    def has_headroom(self, amount, reserve):
+        """Whether ``amount`` fits while keeping ``reserve`` of the capacity untouched"""
+        return self.available - amount >= self.capacity * reserve
+
+
+class RateLimiter:
+    """Request and token buckets of one model, shared by all sessions; callers queue instead of failing"""
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_wait=MAX_QUEUE_WAIT):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+        self._state_lock = threading.Lock()
+        # Held while waiting, so queued requests are admitted one at a time in arrival order
+        self._queue_lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def _wait_time(self, tokens):
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens), self._paused_until - now)
+
+    def acquire(self, tokens):
+        """Block until the request fits both buckets; returns seconds spent queued"""
+        start = time.monotonic()
+        if not self._queue_lock.acquire(timeout=self.max_wait):
+            raise RateLimitTimeout("Timed out waiting in the LLM request queue")
+        try:
+            while True:
+                with self._state_lock:
+                    wait = self._wait_time(tokens)
+                    if wait <= 0:
+                        self.requests.consume(1)
+                        self.tokens.consume(tokens)
+                        return time.monotonic() - start
+                if time.monotonic() - start + wait > self.max_wait:
+                    raise RateLimitTimeout(f"Rate limit queue wait would exceed {self.max_wait:.0f}s")
+                time.sleep(min(wait, 1.0))
+        finally:
+            self._queue_lock.release()
+
+    def try_acquire(self, tokens, reserve=BACKGROUND_RESERVE):
+        """Take budget without waiting, only if a reserve is left for interactive requests"""
+        with self._state_lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            if now < self._paused_until or self._queue_lock.locked():
+                return False
+            if not (self.requests.has_headroom(1, reserve) and self.tokens.has_headroom(tokens, reserve)):
+                return False
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            return True
+
+    def pause(self, seconds):
+        """Hold every queued request, e.g. after a 429"""
+        with self._state_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Sync the buckets with the server's view of the remaining budget"""
+        with self._state_lock:
+            now = time.monotonic()
+            for bucket, name in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+                remaining = headers.get(f'x-ratelimit-remaining-{name}')
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+                bucket.sync(remaining, parse_duration(headers.get(f'x-ratelimit-reset-{name}')), now)
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class _Flight:
+    """One upstream call and everything it produced, shared by identical concurrent requests"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.stats = {}
+        self.result = None
+        self.error = None
+        self.done = False
+        self.consumers = 0
+
+
+class SingleFlight:
+    """Identical requests in flight at the same time share one upstream call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.upstream = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(payload, mode, background=False):
+        """Model, messages and every sampling parameter; background work only joins background work"""
+        raw = json.dumps([payload, mode, background], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def join(self, key):
+        """The flight for ``key`` and whether the caller leads it (makes the upstream call)"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.upstream += 1
+            else:
+                self.coalesced += 1
+            flight.consumers += 1
+            return flight, leader
+
+    def leave(self, flight):
+        with self._lock:
+            flight.consumers -= 1
+
+    def abandon_if_unused(self, key, flight):
+        """Retire a streaming flight nobody is reading any more; True if it was retired"""
+        with self._lock:
+            if flight.consumers > 0:
+                return False
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            return True
+
+    def finish(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.cond:
+            flight.done = True
+            flight.cond.notify_all()
+
+    def metrics(self):
+        total = self.upstream + self.coalesced
+        return {'upstream': self.upstream, 'coalesced': self.coalesced,
+                'dedup_rate': round(self.coalesced / total, 4) if total else 0.0}
+
+
+# Copied from the shared call into every participant's stats
+SHARED_STATS = ('usage', 'prompt_estimate', 'completion_tokens', 'tokens_per_sec', 'tool_calls')
+
+
+def _shared_stats(stats, flight, leader, start, first_token_at=None):
+    for key in SHARED_STATS:
+        if key in flight.stats:
+            stats[key] = flight.stats[key]
+    if leader:
+        stats['queue_wait'] = flight.stats.get('queue_wait', 0.0)
+        stats['retries'] = flight.stats.get('retries', 0)
+        stats['rate_limited'] = flight.stats.get('rate_limited', 0)
+    else:
+        stats['queue_wait'] = 0.0
+        stats['retries'] = 0
+        stats['rate_limited'] = 0
+        stats['coalesced'] = True
+    end = time.perf_counter()
+    stats['total'] = round(end - start, 4)
+    stats['ttft'] = round((first_token_at or end) - start, 4)
+
+
+class LLMClient:
+    """Process-wide chat completions client: pooled connections, retries and rate limiting"""
+
+    def __init__(self, base_url=None, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT, coalesce=True):
+        self.base_url = base_url or GROQ_BASE_URL
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.flights = SingleFlight() if coalesce else None
+
+        # Keep-alive connections are reused across requests and sessions
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def limiter(self, model):
+        """Rate limiter for one model, created on its first request"""
+        with self._limiters_lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = self._limiters[model] = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+            return limiter
+
+    def _post(self, payload, api_key, stats, stream=False, background=False):
+        """POST with queueing and retries; returns a successful response
+
+        Background requests never queue or retry: they run only when the
+        rate limit has spare budget and give up on the first failure.
+        """
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        # Fallback for telemetry when the server doesn't report usage
+        stats['prompt_estimate'] = estimate_request_tokens(payload) - int(payload.get('max_tokens') or 0)
+        limiter = self.limiter(payload.get('model'))
+        if background:
+            if not limiter.try_acquire(estimate_request_tokens(payload)):
+                raise RateLimitTimeout("No spare rate limit budget for background requests")
+            stats['queue_wait'] = 0.0
+        else:
+            stats['queue_wait'] = round(limiter.acquire(estimate_request_tokens(payload)), 4)
+        stats['retries'] = 0
+        stats['rate_limited'] = 0
+        max_retries = 0 if background else self.max_retries
+
+        for attempt in range(max_retries + 1):
+            last_attempt = attempt == max_retries
+            try:
+                response = self.session.post(chat_completions_url(self.base_url), json=payload,
+                                             headers=headers, stream=stream, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+                stats['retries'] += 1
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            limiter.update_from_headers(response.headers)
+            if response.status_code in RETRY_STATUSES:
+                delay = parse_retry_after(response.headers)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                if response.status_code == 429:
+                    stats['rate_limited'] += 1
+                    limiter.pause(delay)
+                if not last_attempt:
+                    response.close()
+                    stats['retries'] += 1
+                    time.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            return response
+
+    def stream(self, payload, api_key, stats=None):
+        """Yield content deltas of a streaming chat completion as they arrive
+
+        ``stats`` (a dict) receives queue_wait, retries, ttft, total,
+        completion_tokens and tokens_per_sec; it is filled in even if the
+        consumer stops early. Identical streams already in flight are
+        joined and replayed from the first chunk instead of being sent again.
+        """
+        stats = stats if stats is not None else {}
+        if self.flights is None:
+            return self._stream_upstream(payload, api_key, stats)
+        key = SingleFlight.key(payload, 'stream')
+        flight, leader = self.flights.join(key)
+        if leader:
+            threading.Thread(target=self._pump, args=(key, flight, payload, api_key),
+                             name="llm-stream", daemon=True).start()
+        return self._follow_stream(flight, stats, leader)
+
+    def _pump(self, key, flight, payload, api_key):
+        """Read the upstream stream into the shared flight until it ends or nobody is listening"""
+        chunks = self._stream_upstream(payload, api_key, flight.stats)
+        try:
+            for chunk in chunks:
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+                if self.flights.abandon_if_unused(key, flight):
+                    break
+        except Exception as e:
+            flight.error = e
+        finally:
+            chunks.close()
+            self.flights.finish(key, flight)
+
+    def _follow_stream(self, flight, stats, leader):
+        start = time.perf_counter()
+        first_token_at = None
+        position = 0
+        try:
+            while True:
+                with flight.cond:
+                    flight.cond.wait_for(lambda: position < len(flight.chunks) or flight.done)
+                    new = flight.chunks[position:]
+                    finished = flight.done and position + len(new) == len(flight.chunks)
+                for chunk in new:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield chunk
+                position += len(new)
+                if finished:
+                    break
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            self.flights.leave(flight)
+            _shared_stats(stats, flight, leader, start, first_token_at)
+
+    def _stream_upstream(self, payload, api_key, stats):
+        body = dict(payload, stream=True, stream_options={'include_usage': True})
+
+        start = time.perf_counter()
+        first_token_at = None
+        chunks = 0
+        tool_calls = {}
+        try:
+            # Retries only happen before the first byte; a broken stream is not replayed
+            with self._post(body, api_key, stats, stream=True) as response:
+                # chunk_size=None hands over bytes as soon as they arrive
+                for data in iter_sse_data(response.iter_lines(chunk_size=None)):
+                    if data.strip() == '[DONE]':
+                        break
+                    event = json.loads(data)
+
+                    usage = event.get('usage') or event.get('x_groq', {}).get('usage')
+                    if usage:
+                        stats['usage'] = usage
+
+                    for choice in event.get('choices') or []:
+                        for call in (choice.get('delta') or {}).get('tool_calls') or []:
+                            _merge_tool_call_delta(tool_calls, call)
+                        delta = (choice.get('delta') or {}).get('content')
+                        if delta:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            chunks += 1
+                            yield delta
+        finally:
+            if tool_calls:
+                stats['tool_calls'] = [tool_calls[i] for i in sorted(tool_calls)]
+            _finish_stats(stats, start, first_token_at, chunks)
+
+    def complete(self, payload, api_key, stats=None, background=False):
+        """Blocking chat completion; returns the answer text
+
+        Identical requests already in flight wait for that call's answer.
+        """
+        stats = stats if stats is not None else {}
+        if self.flights is None:
+            return self._complete_upstream(payload, api_key, stats, background)
+
+        key = SingleFlight.key(payload, 'complete', background)
+        flight, leader = self.flights.join(key)
+        start = time.perf_counter()
+        try:
+            if leader:
+                try:
+                    flight.result = self._complete_upstream(payload, api_key, flight.stats, background)
+                except Exception as e:
+                    flight.error = e
+                finally:
+                    self.flights.finish(key, flight)
+            else:
+                with flight.cond:
+                    flight.cond.wait_for(lambda: flight.done)
+        finally:
+            self.flights.leave(flight)
+            _shared_stats(stats, flight, leader, start)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def coalescing_stats(self):
+        """Upstream calls made and identical calls that were shared instead"""
+        if self.flights is None:
+            return {'upstream': 0, 'coalesced': 0, 'dedup_rate': 0.0}
+        return self.flights.metrics()
+
+    def _complete_upstream(self, payload, api_key, stats, background=False):
+        start = time.perf_counter()
+        response = self._post(payload, api_key, stats, background=background)
+        data = response.json()
+
+        if data.get('usage'):
+            stats['usage'] = data['usage']
+        _finish_stats(stats, start, None, 0)
+        stats['ttft'] = stats['total']
+        message = data['choices'][0]['message']
+        if message.get('tool_calls'):
+            stats['tool_calls'] = message['tool_calls']
+            return message.get('content') or ''
+        return message['content']
+
+
+def _merge_tool_call_delta(tool_calls, delta):
+    """Assemble a streamed tool call; arguments arrive in pieces keyed by index"""
+    call = tool_calls.setdefault(delta.get('index', len(tool_calls)),
+                                 {'id': None, 'type': 'function', 'function': {'name': '', 'arguments': ''}})
+    if delta.get('id'):
+        call['id'] = delta['id']
+    function = delta.get('function') or {}
+    call['function']['name'] += function.get('name') or ''
+    call['function']['arguments'] += function.get('arguments') or ''
+
+
+def _finish_stats(stats, start, first_token_at, chunks):
+    """Fill in latency and throughput for a finished (or cancelled) turn"""
+    end = time.perf_counter()
+    stats['total'] = round(end - start, 4)
+    if first_token_at is not None:
+        stats['ttft'] = round(first_token_at - start, 4)
+
+    usage = stats.get('usage') or {}
+    completion_tokens = usage.get('completion_tokens', chunks)
+    stats['completion_tokens'] = completion_tokens
+    generation_time = end - (first_token_at or start + stats.get('queue_wait', 0))
+    if completion_tokens and generation_time > 0:
+        stats['tokens_per_sec'] = round(completion_tokens / generation_time, 1)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The shared client for this server process"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
+
+
+def coalescing_stats():
+    """Request coalescing metrics for the shared client"""
+    return get_client().coalescing_stats()
+
+
+def stream_chat(payload, api_key, stats=None):
+    """Stream a chat completion through the shared client"""
+    return get_client().stream(payload, api_key, stats=stats)
+
+
+def complete_chat(payload, api_key, stats=None, background=False):
+    """Blocking chat completion through the shared client"""
+    return get_client().complete(payload, api_key, stats=stats, background=background)
+
+
+def _tool_results(calls, handler):
+    """Assistant tool-call message followed by one tool message per call"""
+    messages = [{'role': 'assistant', 'content': None, 'tool_calls': calls}]
+    for call in calls:
+        function = call.get('function') or {}
+        messages.append({'role': 'tool', 'tool_call_id': call.get('id'),
+                         'content': handler(function.get('name'), function.get('arguments'))})
+    return messages
+
+
+def _merge_round_stats(stats, round_stats):
+    stats['queue_wait'] = round(stats.get('queue_wait', 0) + round_stats.get('queue_wait', 0), 4)
+    stats['retries'] = stats.get('retries', 0) + round_stats.get('retries', 0)
+    stats['rate_limited'] = stats.get('rate_limited', 0) + round_stats.get('rate_limited', 0)
+    stats['rounds'] = stats.get('rounds', 0) + 1
+    # Every round is billed, so token counts add up
+    for key in ('prompt_estimate', 'completion_tokens'):
+        if key in round_stats:
+            stats[key] = stats.get(key, 0) + round_stats[key]
+    if round_stats.get('usage'):
+        usage = stats.setdefault('usage', {})
+        for key, value in round_stats['usage'].items():
+            if isinstance(value, (int, float)):
+                usage[key] = usage.get(key, 0) + value
+    if 'tokens_per_sec' in round_stats:
+        stats['tokens_per_sec'] = round_stats['tokens_per_sec']
+
+
+def _tool_round(payload, messages, round_index, max_rounds):
+    body = dict(payload, messages=messages)
+    if round_index == max_rounds:
+        body['tool_choice'] = 'none'
+    return body
+
+
+def stream_chat_with_tools(payload, api_key, handler, stats=None, max_rounds=MAX_TOOL_ROUNDS):
+    """Stream a chat completion, running the model's tool calls locally between rounds
+
+    ``handler(name, arguments)`` returns the tool result text. Only the
+    final answer's content is yielded; ttft and total cover all rounds.
+    """
+    stats = stats if stats is not None else {}
+    messages = list(payload['messages'])
+    start = time.perf_counter()
+    try:
+        for round_index in range(max_rounds + 1):
+            round_stats = {}
+            for chunk in stream_chat(_tool_round(payload, messages, round_index, max_rounds), api_key, round_stats):
+                if 'ttft' not in stats:
+                    stats['ttft'] = round(time.perf_counter() - start, 4)
+                yield chunk
+            _merge_round_stats(stats, round_stats)
+            if not round_stats.get('tool_calls'):
+                return
+            messages += _tool_results(round_stats['tool_calls'], handler)
+    finally:
+        stats['total'] = round(time.perf_counter() - start, 4)
+
+
+def complete_chat_with_tools(payload, api_key, handler, stats=None, max_rounds=MAX_TOOL_ROUNDS,
+                             background=False):
+    """Blocking chat completion with the same local tool loop"""
+    stats = stats if stats is not None else {}
+    messages = list(payload['messages'])
+    start = time.perf_counter()
+    answer = ''
+    for round_index in range(max_rounds + 1):
+        round_stats = {}
+        answer = complete_chat(_tool_round(payload, messages, round_index, max_rounds), api_key,
+                               stats=round_stats, background=background)
+        _merge_round_stats(stats, round_stats)
+        if not round_stats.get('tool_calls'):
+            break
+        messages += _tool_results(round_stats['tool_calls'], handler)
+    stats['total'] = round(time.perf_counter() - start, 4)
+    stats['ttft'] = stats['total']
+    return answer
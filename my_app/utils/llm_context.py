@@ -0,0 +1,148 @@
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dataset_version import dataset_version
+
+DEFAULT_TOKEN_BUDGET = 1500
+# Rough size of a token for English text and tabular numbers
+CHARS_PER_TOKEN = 4
+# Top values per text column kept for matching question words
+MATCH_VALUES = 20
+SAMPLE_ROWS = 3
+SAMPLE_COLUMNS = 8
+
+SYSTEM_PROMPT = (
+    "You are a direct AI assistant. Give short, clear, straight-to-the-point answers. "
+    "No lengthy explanations unless specifically asked. Be concise and factual."
+)
+TOOLS_PROMPT = (
+    " When the answer depends on exact figures from the dataset, call run_query instead of estimating; "
+    "use the column names exactly as listed."
+)
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def estimate_tokens(text):
+    """Cheap token estimate, good enough for budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def tokenize(text):
+    """Lowercase word tokens; splits snake_case and camelCase names too"""
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', str(text))
+    return set(_WORD.findall(text.lower()))
+
+
+def _fmt(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def dataset_summary(df):
+    """Compact one-line profile per column, computed once per dataset version"""
+    return _dataset_summary(dataset_version(df), df)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _dataset_summary(version, _df):
+    df = _df
+    numeric = df.select_dtypes(include=[np.number])
+    described = numeric.describe().T if not numeric.empty else pd.DataFrame()
+    missing = df.isnull().mean()
+
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        info = f"{col} ({series.dtype})"
+        values = []
+
+        if col in described.index:
+            stats = described.loc[col]
+            info += f": min {_fmt(stats['min'])}, mean {_fmt(stats['mean'])}, max {_fmt(stats['max'])}"
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            info += f": {series.min()} to {series.max()}"
+        else:
+            counts = series.value_counts()
+            top = ", ".join(f"{v} ({c / max(len(series), 1):.0%})" for v, c in counts.head(3).items())
+            info += f": {len(counts)} unique, top: {top}"
+            values = [str(v).lower() for v in counts.index[:MATCH_VALUES]]
+
+        if missing[col] > 0:
+            info += f", {missing[col]:.0%} missing"
+        columns.append({'name': col, 'line': info, 'name_tokens': tokenize(col), 'values': values})
+
+    return {'rows': len(df), 'n_cols': len(df.columns), 'columns': columns}
+
+
+def rank_columns(question, summary):
+    """Columns ordered by lexical relevance to the question"""
+    words = tokenize(question)
+    text = question.lower()
+
+    def score(column):
+        points = 0
+        if str(column['name']).lower() in text:
+            points += 10
+        points += 3 * len(words & column['name_tokens'])
+        points += sum(1 for value in column['values'] if value in words or (len(value) > 3 and value in text))
+        return points
+
+    scored = [(score(c), i, c) for i, c in enumerate(summary['columns'])]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [c for _, _, c in scored]
+
+
+def build_context(df, question, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Dataset context for the prompt: relevant columns first, trimmed to the token budget"""
+    summary = dataset_summary(df)
+    header = f"Dataset: {summary['rows']:,} rows x {summary['n_cols']} columns\nColumns:"
+    lines = [header]
+    used = estimate_tokens(header)
+
+    included = []
+    for column in rank_columns(question, summary):
+        line = f"- {column['line']}"
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        included.append(column['name'])
+        used += cost
+
+    skipped = summary['n_cols'] - len(included)
+    if skipped:
+        note = f"({skipped} more columns omitted)"
+        lines.append(note)
+        used += estimate_tokens(note)
+
+    # A few sample rows of the most relevant columns, if they still fit
+    sample_cols = included[:SAMPLE_COLUMNS]
+    if sample_cols:
+        sample = "Sample rows:\n" + df[sample_cols].head(SAMPLE_ROWS).to_string(max_colwidth=30)
+        if used + estimate_tokens(sample) <= token_budget:
+            lines.append(sample)
+
+    return "\n".join(lines)
+
+
+def chat_payload(question, context, model, temperature, max_tokens, history_messages=None, tools=None):
+    """Chat completions request body shared by the chatbot page and the benchmarks"""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT + (TOOLS_PROMPT if tools else "")},
+            *(history_messages or []),
+            {"role": "user", "content": f"Dataset Context:\n{context}\n\nUser Question: {question}"}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if tools:
+        payload["tools"] = tools
+        payload["tool_choice"] = "auto"
+    return payload
@@ -0,0 +1,308 @@
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dataset_version import dataset_version, set_version
+from utils.paths import DATA_DIR
+from utils.tracing import span
+
+MEMORY_BUDGET = int(float(os.getenv("APP_MEMORY_BUDGET_MB", "2048")) * 1024 ** 2)
+# Each server process spills into its own <pid>-<random> directory under this one
+SPILL_DIR = os.path.join(DATA_DIR, "spill")
+# One dataset may take at most this share of the budget; larger uploads are downsampled or refused
+MAX_DATASET_SHARE = 0.5
+# Parsed size relative to file size; compressed Excel expands the most
+EXPANSION = {'.csv': 2.0, '.json': 2.0, '.xls': 4.0, '.xlsx': 8.0}
+# Text columns are sized from a sample instead of a full deep scan
+SIZE_SAMPLE_ROWS = 10_000
+# Column dtypes numpy can memory-map straight from an .npy file
+MAPPABLE_KINDS = 'biufcmM'
+
+
+class DatasetTooLarge(ValueError):
+    """An upload that could not fit in the memory budget even downsampled"""
+
+
+def frame_bytes(df):
+    """Approximate in-memory size; exact for numpy columns, sampled for text and objects"""
+    total = int(df.index.memory_usage(deep=False))
+    sample = df.head(SIZE_SAMPLE_ROWS)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in MAPPABLE_KINDS:
+            total += series.dtype.itemsize * len(series)
+        elif len(sample):
+            total += int(sample[col].memory_usage(deep=True, index=False) / len(sample) * len(series))
+    return total
+
+
+def _mappable(series):
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in MAPPABLE_KINDS
+
+
+def write_columns(df, path):
+    """One file per column: .npy for numpy columns (memory-mappable), pickle for the rest"""
+    os.makedirs(path, exist_ok=True)
+    files = []
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if _mappable(series):
+            name = f"{i}.npy"
+            np.save(os.path.join(path, name), series.to_numpy(), allow_pickle=False)
+        else:
+            name = f"{i}.pkl"
+            series.to_pickle(os.path.join(path, name))
+        files.append(name)
+    with open(os.path.join(path, "meta.pkl"), "wb") as f:
+        pickle.dump({'columns': list(df.columns), 'files': files, 'index': df.index}, f)
+
+
+def read_columns(path):
+    """Frame backed by memory maps of its numpy columns; returns (frame, bytes not mapped)"""
+    with open(os.path.join(path, "meta.pkl"), "rb") as f:
+        meta = pickle.load(f)
+    columns = []
+    loaded = 0
+    for name in meta['files']:
+        file = os.path.join(path, name)
+        if name.endswith('.npy'):
+            # Copy-on-write maps: pages are read from disk lazily and a write never reaches the file
+            columns.append(np.load(file, mmap_mode='c'))
+        else:
+            series = pd.read_pickle(file)
+            loaded += frame_bytes(series.to_frame())
+            columns.append(series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array)
+    # copy=False keeps the maps instead of reading every column into memory
+    df = pd.DataFrame(dict(enumerate(columns)), index=meta['index'], copy=False)
+    df.columns = meta['columns']
+    return df, loaded
+
+
+class SourceFile:
+    """An uploaded file kept on disk for engines that read it directly; deleted with its last reference"""
+
+    def __init__(self, directory, name, data):
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.path = os.path.join(directory, uuid.uuid4().hex + os.path.splitext(name.lower())[1])
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        weakref.finalize(self, _remove_file, self.path)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _process_alive(pid):
+    """Whether a process with this id is running; unknown (assumed alive) where signals can't probe it"""
+    if os.name == 'nt':
+        # os.kill on Windows terminates the process instead of probing it
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def remove_stale_spill_dirs(root):
+    """Delete the spill directories of server processes that are no longer running"""
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return
+    for entry in entries:
+        pid = entry.split('-', 1)[0]
+        if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+class DatasetHandle:
+    """A dataset the governor may spill to disk; get() always returns the frame"""
+
+    def __init__(self, governor, key, df, label, version, meta):
+        self.governor = governor
+        self.key = key
+        self.label = label
+        self.version = version
+        self.meta = meta
+        self.nbytes = frame_bytes(df)
+        self.resident_bytes = self.nbytes
+        self.path = os.path.join(governor.spill_dir, key)
+        self.spilled = False
+        self.spills = 0
+        self.last_access = time.monotonic()
+        self._df = df
+        self._lock = threading.Lock()
+        # Spill files go away with the last session holding the dataset
+        weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    @property
+    def state(self):
+        if self._df is None:
+            return 'spilled'
+        return 'mapped' if self.spilled else 'in memory'
+
+    def get(self):
+        return self.governor.access(self)
+
+    def _load(self):
+        """Frame for a caller; reloads spilled data as memory maps"""
+        with self._lock:
+            self.last_access = time.monotonic()
+            if self._df is None:
+                with span("memory.reload", dataset=self.label):
+                    self._df, self.resident_bytes = read_columns(self.path)
+                set_version(self._df, self.version)
+            return self._df
+
+    def _spill(self):
+        """Write to disk if not there yet and drop the in-memory frame; returns bytes freed"""
+        with self._lock:
+            if self._df is None:
+                return 0
+            if not self.spilled:
+                with span("memory.spill", dataset=self.label):
+                    write_columns(self._df, self.path)
+                self.spilled = True
+            freed = self.resident_bytes
+            self._df = None
+            self.resident_bytes = 0
+            self.spills += 1
+            return freed
+
+
+class MemoryGovernor:
+    """Server-wide budget for datasets held by all sessions, spilling least recently used ones to disk"""
+
+    def __init__(self, budget=MEMORY_BUDGET, spill_dir=SPILL_DIR):
+        self.budget = budget
+        # Other server processes (and benchmarks) may share the root; only this directory is ours
+        remove_stale_spill_dirs(spill_dir)
+        self.spill_dir = os.path.join(spill_dir, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        # Sessions hold the handles; a dataset no session references any more drops out
+        self._handles = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    @property
+    def max_dataset_bytes(self):
+        return int(self.budget * MAX_DATASET_SHARE)
+
+    def lookup(self, key):
+        return self._handles.get(key)
+
+    def register(self, df, label, key=None, meta=None):
+        """Handle for a frame; frames with the same key (content digest or version) are shared"""
+        version = dataset_version(df)
+        key = key or version or uuid.uuid4().hex
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = DatasetHandle(self, key, df, label, version, meta or {})
+                self._handles[key] = handle
+        self.enforce(keep=handle)
+        return handle
+
+    def access(self, handle):
+        df = handle._load()
+        self.enforce(keep=handle)
+        return df
+
+    def resident_bytes(self):
+        return sum(h.resident_bytes for h in list(self._handles.values()))
+
+    def enforce(self, keep=None):
+        """Spill least recently used datasets until the resident total fits the budget"""
+        with self._lock:
+            handles = sorted(self._handles.values(), key=lambda h: h.last_access)
+            total = sum(h.resident_bytes for h in handles)
+            for handle in handles:
+                if total <= self.budget:
+                    break
+                if handle is not keep and handle.resident_bytes:
+                    total -= handle._spill()
+        return total
+
+    def keep_source(self, data, name):
+        """Copy of an uploaded file under the spill directory"""
+        return SourceFile(os.path.join(self.spill_dir, 'sources'), name, data)
+
+    def plan_upload(self, size, name):
+        """('load', None) or ('sample', fraction of rows to keep) for a file; raises if it can never fit"""
+        ext = os.path.splitext(name.lower())[1]
+        estimate = size * EXPANSION.get(ext, 2.0)
+        if estimate <= self.max_dataset_bytes:
+            return 'load', None
+        if ext == '.csv':
+            # CSV is read in chunks, so a sample of any size file fits
+            return 'sample', self.max_dataset_bytes / estimate
+        raise DatasetTooLarge(
+            f"{name} would need about {estimate / 1024 ** 2:,.0f} MB in memory; the limit per dataset is "
+            f"{self.max_dataset_bytes / 1024 ** 2:,.0f} MB. Upload it as CSV to load a sample, or a smaller extract."
+        )
+
+    def fit(self, df, seed=0):
+        """Frame cut to a random row sample when it exceeds the per-dataset limit; returns (frame, fraction)"""
+        size = frame_bytes(df)
+        if size <= self.max_dataset_bytes:
+            return df, None
+        fraction = self.max_dataset_bytes / size
+        return df.sample(frac=fraction, random_state=seed).sort_index(), fraction
+
+    def stats(self):
+        """Budget usage and one row per live dataset, for the admin view"""
+        handles = list(self._handles.values())
+        rows = [{'dataset': h.label, 'key': h.key, 'state': h.state, 'size_mb': round(h.nbytes / 1024 ** 2, 1),
+                 'resident_mb': round(h.resident_bytes / 1024 ** 2, 1), 'spills': h.spills,
+                 'idle_s': round(time.monotonic() - h.last_access, 1)} for h in handles]
+        return {
+            'budget': self.budget,
+            'resident': sum(h.resident_bytes for h in handles),
+            'datasets': len(handles),
+            'spilled': sum(1 for h in handles if h.state == 'spilled'),
+            'mapped': sum(1 for h in handles if h.state == 'mapped'),
+            'table': pd.DataFrame(rows, columns=['dataset', 'key', 'state', 'size_mb', 'resident_mb', 'spills',
+                                                 'idle_s']),
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """The memory governor shared by every session in this server process"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MemoryGovernor()
+        return _governor
+
+
+def show_memory_status():
+    """Sidebar summary of the server-wide dataset memory budget"""
+    stats = get_governor().stats()
+    used = stats['resident'] / stats['budget'] if stats['budget'] else 0
+    st.sidebar.markdown("### 🧠 Server Memory")
+    st.sidebar.progress(min(used, 1.0), text=f"{stats['resident'] / 1024 ** 2:,.0f} / "
+                                             f"{stats['budget'] / 1024 ** 2:,.0f} MB for datasets")
+    st.sidebar.caption(f"{stats['datasets']} datasets open across sessions • {stats['mapped']} memory-mapped • "
+                       f"{stats['spilled']} spilled to disk")
+    if stats['datasets']:
+        with st.sidebar.expander("🗃️ Datasets"):
+            st.dataframe(stats['table'].drop(columns=['key']), use_container_width=True, hide_index=True)
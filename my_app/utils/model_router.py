@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+
+import numpy as np
+
+from utils.telemetry import get_telemetry
+
+AUTO = "auto"
+
+# Quality tier (higher is better) and priors used until enough requests have been seen
+MODEL_PROFILES = {
+    "llama-3.3-70b-versatile": {'tier': 3, 'ttft': 0.35, 'tokens_per_sec': 250.0, 'prefill_per_1k': 0.04},
+    "llama-3.1-70b-versatile": {'tier': 3, 'ttft': 0.40, 'tokens_per_sec': 220.0, 'prefill_per_1k': 0.05},
+    "mixtral-8x7b-32768": {'tier': 2, 'ttft': 0.25, 'tokens_per_sec': 480.0, 'prefill_per_1k': 0.02},
+    "llama-3.1-8b-instant": {'tier': 1, 'ttft': 0.15, 'tokens_per_sec': 750.0, 'prefill_per_1k': 0.01},
+}
+DEFAULT_LATENCY_TARGET = 4.0
+STATS_WINDOW = 15 * 60
+STATS_REFRESH = 10.0
+# Recent requests needed before observed numbers replace the priors
+MIN_SAMPLES = 5
+# A model counts as throttled if this share of its last-two-minute requests got a 429 or queued long
+# on that model's own rate limit
+THROTTLE_WINDOW = 120
+THROTTLE_SHARE = 0.3
+THROTTLE_QUEUE_MS = 2000
+
+_COMPLEX = re.compile(r'\b(why|explain|compare|correlat\w*|trend\w*|predict\w*|forecast\w*|recommend\w*|'
+                      r'insight\w*|pattern\w*|analy[sz]\w*|relationship\w*|cause\w*|impact\w*|strategy|'
+                      r'interpret\w*|suggest\w*|improve\w*)\b')
+_SIMPLE = re.compile(r'^\s*(what is|what\'s|how many|count|list|show|which|when|who|define|name)\b')
+
+
+def question_complexity(question):
+    """0 for lookups like 'how many rows?', up to 1 for open-ended analysis"""
+    text = question.lower()
+    score = min(len(text.split()), 40) / 80
+    score += 0.25 * min(len(_COMPLEX.findall(text)), 2)
+    score += 0.1 * max(0, text.count('?') + text.count(' and ') - 1)
+    if _SIMPLE.match(text):
+        score -= 0.2
+    return float(np.clip(score, 0.0, 1.0))
+
+
+def required_tier(complexity):
+    if complexity >= 0.55:
+        return 3
+    if complexity >= 0.3:
+        return 2
+    return 1
+
+
+class RollingStats:
+    """Per-model latency and throttling from recent telemetry, refreshed every few seconds"""
+
+    def __init__(self, window=STATS_WINDOW, refresh=STATS_REFRESH):
+        self.window = window
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._loaded = 0.0
+        self._stats = {}
+
+    def get(self, model):
+        with self._lock:
+            if time.time() - self._loaded > self.refresh:
+                self._stats = self._load()
+                self._loaded = time.time()
+            return self._stats.get(model, {})
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = 0.0
+
+    def _load(self):
+        now = time.time()
+        df = get_telemetry().frame(since=now - self.window)
+        df = df[(df['cache'] != 'hit') & df['model'].notna()]
+        stats = {}
+        for model, group in df.groupby('model'):
+            answered = group[group['error'] == 0]
+            streamed = answered[(answered['streamed'] == 1) & (answered['total_ms'] > answered['ttft_ms'])]
+            tps = streamed['completion_tokens'] / ((streamed['total_ms'] - streamed['ttft_ms']) / 1000)
+            recent = group[group['ts'] >= now - THROTTLE_WINDOW]
+            throttled = (recent['rate_limited'] > 0) | (recent['queue_ms'] > THROTTLE_QUEUE_MS)
+            stats[model] = {
+                'samples': len(answered),
+                'ttft_p75': float(streamed['ttft_ms'].quantile(0.75)) / 1000 if len(streamed) else None,
+                'tokens_per_sec': float(tps.median()) if len(tps) else None,
+                'throttled': bool(len(recent) >= 2 and throttled.mean() >= THROTTLE_SHARE),
+                'error_rate': float((group['error'] == 1).mean()),
+            }
+        return stats
+
+
+class ModelRouter:
+    """Pick the smallest model good enough for the question that is predicted to meet the latency target"""
+
+    def __init__(self, models=None, stats=None):
+        self.models = list(models or MODEL_PROFILES)
+        self.stats = stats or RollingStats()
+
+    def predict(self, model, prompt_tokens, output_tokens):
+        """Expected seconds to a complete answer: observed numbers once there are enough, else priors"""
+        profile = MODEL_PROFILES.get(model, MODEL_PROFILES["llama-3.3-70b-versatile"])
+        observed = self.stats.get(model)
+        ttft = profile['ttft'] + profile['prefill_per_1k'] * prompt_tokens / 1000
+        tps = profile['tokens_per_sec']
+        if observed.get('samples', 0) >= MIN_SAMPLES:
+            ttft = observed.get('ttft_p75') or ttft
+            tps = observed.get('tokens_per_sec') or tps
+        return ttft + output_tokens / tps
+
+    def route(self, question, prompt_tokens, max_tokens, target=DEFAULT_LATENCY_TARGET):
+        """Returns (model, reason)"""
+        complexity = question_complexity(question)
+        tier = required_tier(complexity)
+        # Longer, more open questions tend to get longer answers
+        output_tokens = min(max_tokens, int(80 + 420 * complexity))
+
+        candidates = []
+        for model in self.models:
+            profile = MODEL_PROFILES.get(model, {'tier': 1})
+            observed = self.stats.get(model)
+            candidates.append({
+                'model': model,
+                'tier': profile['tier'],
+                'seconds': self.predict(model, prompt_tokens, output_tokens),
+                'throttled': observed.get('throttled', False),
+            })
+
+        available = [c for c in candidates if not c['throttled']] or candidates
+        fits = [c for c in available if c['tier'] >= tier and c['seconds'] <= target]
+        if fits:
+            best = min(fits, key=lambda c: (c['tier'], c['seconds']))
+            reason = f"complexity {complexity:.2f}, ~{best['seconds']:.1f}s predicted"
+        else:
+            # Nothing adequate is fast enough: the best model that meets the target, else the fastest one
+            in_target = [c for c in available if c['seconds'] <= target]
+            if in_target:
+                best = max(in_target, key=lambda c: (c['tier'], -c['seconds']))
+                reason = f"fallback, larger models over the {target:g}s target"
+            else:
+                best = min(available, key=lambda c: c['seconds'])
+                reason = f"fallback, fastest available (~{best['seconds']:.1f}s)"
+        if len(available) < len(candidates):
+            reason += "; skipped rate-limited " + ", ".join(c['model'] for c in candidates if c['throttled'])
+        return best['model'], reason
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """The shared router; its rolling stats are read from the telemetry store"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -0,0 +1,10 @@
+import os
+
+# Local state shared by all sessions: caches, history, telemetry
+DATA_DIR = os.getenv("APP_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".appdata"))
+
+
+def data_path(name):
+    """Path of a file in the local data directory, creating the directory if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.charts import PALETTE
+from utils.paths import DATA_DIR
+from utils.tracing import current_trace, export_trace, resume_trace, span, start_trace
+
+TRACE_DIR = os.path.join(DATA_DIR, "traces")
+
+
+class StageTimer:
+    """Time real pipeline stages and drive a progress bar from them"""
+
+    def __init__(self, total_stages=None, show_progress=True):
+        self.total_stages = total_stages
+        self.stages = []
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._progress_bar = st.progress(0) if show_progress else None
+        self._status_text = st.empty() if self._progress_bar is not None else None
+
+    @contextmanager
+    def stage(self, name, rows=0, cache_hit=None):
+        """Time a block; the yielded record can be updated with rows / cache_hit"""
+        record = {'stage': name, 'rows': rows, 'cache_hit': cache_hit, 'seconds': 0.0}
+        if self._status_text is not None:
+            self._status_text.text(f'🚀 {name}...')
+
+        start = time.perf_counter()
+        try:
+            with span(name, rows=rows):
+                yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            self.stages.append(record)
+            self._update_progress()
+
+    def _update_progress(self):
+        """Advance the progress bar by completed stages"""
+        if self._progress_bar is None or not self.total_stages:
+            return
+        done = min(len(self.stages), self.total_stages)
+        self._progress_bar.progress(int(done / self.total_stages * 100))
+
+    def finish(self):
+        """Clear the progress widgets once the pipeline is done"""
+        if self._progress_bar is not None:
+            self._progress_bar.empty()
+            self._status_text.empty()
+            self._progress_bar = None
+            self._status_text = None
+
+    @property
+    def total_seconds(self):
+        return round(time.perf_counter() - self._start, 4)
+
+    def to_frame(self):
+        """Stage records as a DataFrame"""
+        frame = pd.DataFrame(self.stages, columns=['stage', 'rows', 'cache_hit', 'seconds'])
+        frame['cache'] = frame['cache_hit'].map({True: 'hit', False: 'miss'}).fillna('-')
+        return frame.drop(columns='cache_hit')
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': self.total_seconds,
+            'stages': self.stages,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, default=str)
+
+
+def show_perf_panel(timer, title="⏱️ Performance", filename="dashboard_perf"):
+    """Collapsible panel with per-stage timings and a JSON export"""
+    with st.expander(title, expanded=False):
+        frame = timer.to_frame()
+        if frame.empty:
+            st.info("No stages recorded for this run.")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Time", f"{timer.total_seconds:.3f} s")
+        col2.metric("Stages", len(frame))
+        slowest = frame.loc[frame['seconds'].idxmax()]
+        col3.metric("Slowest Stage", slowest['stage'], f"{slowest['seconds']:.3f} s", delta_color="off")
+
+        st.dataframe(frame, use_container_width=True, hide_index=True)
+        st.download_button("📥 Export JSON", timer.to_json(), f"{filename}.json", "application/json")
+
+
+def begin_rerun(page):
+    """Start tracing this rerun when the sidebar toggle is on; call before any traced work
+
+    A rerun that never reached the panel (cut short by st.rerun()) is continued rather than lost,
+    so work like an LLM call followed by a rerun shows up in one trace.
+    """
+    if not st.session_state.get("tracing", False):
+        st.session_state.pop("open_trace", None)
+        return start_trace(page, enabled=False)
+    trace = st.session_state.get("open_trace")
+    if trace is not None and trace.name == page:
+        resume_trace(trace)
+    else:
+        trace = start_trace(page)
+    st.session_state.open_trace = trace
+    return trace
+
+
+def flame_figure(frame):
+    """Flame-style chart: one bar per span, placed by start time and stacked by nesting depth"""
+    roots = frame['name'].where(frame['depth'] == 0)
+    # Children take the colour of their top-level span
+    root_of = dict(zip(frame['id'], roots))
+    for row in frame.itertuples():
+        if pd.isna(root_of[row.id]):
+            root_of[row.id] = root_of.get(row.parent)
+    palette = {name: PALETTE[i % len(PALETTE)] for i, name in enumerate(dict.fromkeys(roots.dropna()))}
+    fig = go.Figure(go.Bar(
+        base=frame['start'] * 1000, x=frame['seconds'] * 1000, y=frame['depth'], orientation='h',
+        marker_color=[palette.get(root_of[i], '#999999') for i in frame['id']],
+        text=frame['name'], textposition='inside', insidetextanchor='start',
+        customdata=frame[['self_seconds']] * 1000,
+        hovertemplate='%{text}<br>%{x:.1f} ms (self %{customdata[0]:.1f} ms)<extra></extra>',
+    ))
+    fig.update_layout(height=80 + 36 * (frame['depth'].max() + 1), bargap=0.05, showlegend=False,
+                      xaxis_title='ms since rerun start', margin=dict(l=10, r=10, t=10, b=10),
+                      yaxis=dict(autorange='reversed', showticklabels=False))
+    return fig
+
+
+def show_trace_panel():
+    """Sidebar toggle plus a flame breakdown of this rerun; call last on the page"""
+    trace = current_trace()
+    st.session_state.pop("open_trace", None)
+    with st.sidebar:
+        st.toggle("🔥 Trace reruns", key="tracing", help="Record nested timing spans for each rerun")
+        if trace is None or not st.session_state.get("tracing"):
+            return
+        with st.expander("🔥 Rerun Trace", expanded=True):
+            if not trace.spans:
+                st.info("No spans recorded yet; this rerun skipped the traced code paths.")
+                return
+            frame = trace.to_frame()
+            col1, col2 = st.columns(2)
+            col1.metric("Traced", f"{trace.total_seconds * 1000:.0f} ms")
+            col2.metric("Spans", len(frame))
+            st.plotly_chart(flame_figure(frame), use_container_width=True)
+
+            hottest = (frame.groupby('name')[['self_seconds', 'seconds']].sum()
+                       .sort_values('self_seconds', ascending=False).head(8) * 1000)
+            st.dataframe(hottest.round(1).rename(columns={'self_seconds': 'self ms', 'seconds': 'total ms'}),
+                         use_container_width=True)
+
+            st.download_button("📥 Trace Events", trace.to_json(), f"{trace.name.lower()}.trace.json",
+                               "application/json", help="Chrome trace-event format: Perfetto, chrome://tracing")
+            if st.button("💾 Save Trace File"):
+                st.caption(f"Saved {export_trace(trace, TRACE_DIR)}")
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import requests
+
+from utils.llm_client import RateLimitTimeout, complete_chat, complete_chat_with_tools
+from utils.response_cache import get_response_cache
+from utils.telemetry import record_request
+
+MAX_CONCURRENCY = 3
+
+
+class PrefetchJob:
+    """Answers a batch of questions in the background and stores them in the response cache
+
+    Runs its own asyncio loop on a daemon thread so the page never waits on it.
+    ``jobs`` is a list of (question, cache_key, payload); ``tool_handler``
+    runs the model's tool calls for payloads that offer tools.
+    """
+
+    def __init__(self, jobs, api_key, max_concurrency=MAX_CONCURRENCY, model=None, tool_handler=None):
+        self.jobs = list(jobs)
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.model = model
+        self.tool_handler = tool_handler
+        self.status = {question: 'queued' for question, _, _ in self.jobs}
+        self._loop = asyncio.new_event_loop()
+        self._task = None
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return not self._thread.is_alive() and self._thread.ident is not None
+
+    def counts(self):
+        counts = {}
+        for state in self.status.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def cancel(self):
+        """Drop queued questions; requests already in flight finish but are discarded"""
+        self._cancelled = True
+        if self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._task = self._loop.create_task(self._prefetch_all())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for question, state in self.status.items():
+                if state in ('queued', 'running'):
+                    self.status[question] = 'cancelled'
+            self._loop.close()
+
+    async def _prefetch_all(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(*(self._prefetch_one(semaphore, *job) for job in self.jobs))
+
+    async def _prefetch_one(self, semaphore, question, key, payload):
+        async with semaphore:
+            if self._cancelled:
+                return
+            cache = get_response_cache()
+            if await asyncio.to_thread(cache.contains, key):
+                self.status[question] = 'cached'
+                return
+
+            self.status[question] = 'running'
+            stats = {}
+            try:
+                # The blocking client runs on a worker thread; the semaphore bounds how many at once
+                if self.tool_handler and 'tools' in payload:
+                    answer = await asyncio.to_thread(complete_chat_with_tools, payload, self.api_key,
+                                                     self.tool_handler, stats, background=True)
+                else:
+                    answer = await asyncio.to_thread(complete_chat, payload, self.api_key, stats, True)
+            except RateLimitTimeout:
+                self.status[question] = 'skipped'
+                return
+            except (requests.exceptions.RequestException, KeyError, IndexError, ValueError):
+                self.status[question] = 'failed'
+                record_request('prefetch', dict(stats, error=True), self.model, cache='miss')
+                return
+            record_request('prefetch', stats, self.model, cache='miss')
+
+            if not answer:
+                self.status[question] = 'failed'
+                return
+            await asyncio.to_thread(cache.put, key, answer, stats.get('total', 0.0),
+                                    {'model': self.model, 'prefetched': True})
+            self.status[question] = 'done'
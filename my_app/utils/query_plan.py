@@ -0,0 +1,275 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import numpy as np
+import pandas as pd
+
+from utils.groupby import AGGREGATES, GroupIndex
+
+QUERY_TIMEOUT = 5.0
+MAX_QUERY_MEMORY = 256 * 1024 ** 2
+MAX_RESULT_ROWS = 50
+MAX_FILTERS = 10
+FILTER_OPS = ['==', '!=', '>', '>=', '<', '<=', 'in', 'not in', 'contains', 'isnull', 'notnull']
+
+QUERY_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "run_query",
+        "description": (
+            "Run a query on the full dataset and get back a small result table. "
+            "Use it whenever the answer needs exact numbers (totals, averages, counts, rankings)."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "filters": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "column": {"type": "string"},
+                            "op": {"type": "string", "enum": FILTER_OPS},
+                            "value": {"description": "Comparison value; a list for 'in' / 'not in'"}
+                        },
+                        "required": ["column", "op"]
+                    }
+                },
+                "group_by": {"type": "array", "items": {"type": "string"}},
+                "aggregations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "column": {"type": "string"},
+                            "func": {"type": "string", "enum": AGGREGATES}
+                        },
+                        "required": ["func"]
+                    }
+                },
+                "columns": {"type": "array", "items": {"type": "string"},
+                            "description": "Columns to return when not aggregating"},
+                "sort": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "column": {"type": "string"},
+                            "descending": {"type": "boolean"}
+                        },
+                        "required": ["column"]
+                    }
+                },
+                "limit": {"type": "integer", "minimum": 1, "maximum": MAX_RESULT_ROWS}
+            }
+        }
+    }
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query")
+
+
+class QueryPlanError(ValueError):
+    """The plan is malformed, refers to unknown columns or exceeds the limits"""
+
+
+class QueryTimeout(QueryPlanError):
+    pass
+
+
+def _names(items, field):
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise QueryPlanError(f"'{field}' must be a list")
+    return items
+
+
+def validate_plan(plan, df):
+    """Normalized copy of a plan; raises QueryPlanError for anything not allowed"""
+    if not isinstance(plan, dict):
+        raise QueryPlanError("Query plan must be a JSON object")
+    unknown = set(plan) - {'filters', 'group_by', 'aggregations', 'columns', 'sort', 'limit'}
+    if unknown:
+        raise QueryPlanError(f"Unknown plan fields: {', '.join(sorted(unknown))}")
+
+    columns = {str(c): c for c in df.columns}
+
+    def column(name, field):
+        if not isinstance(name, str) or name not in columns:
+            raise QueryPlanError(f"Unknown column in {field}: {name!r}")
+        return columns[name]
+
+    filters = []
+    for f in _names(plan.get('filters'), 'filters')[:MAX_FILTERS + 1]:
+        if not isinstance(f, dict) or f.get('op') not in FILTER_OPS:
+            raise QueryPlanError(f"Invalid filter: {f!r}")
+        if f['op'] in ('in', 'not in') and not isinstance(f.get('value'), list):
+            raise QueryPlanError(f"Filter '{f['op']}' needs a list value")
+        if f['op'] not in ('isnull', 'notnull') and 'value' not in f:
+            raise QueryPlanError(f"Filter on {f.get('column')!r} needs a value")
+        filters.append({'column': column(f.get('column'), 'filters'), 'op': f['op'], 'value': f.get('value')})
+    if len(filters) > MAX_FILTERS:
+        raise QueryPlanError(f"At most {MAX_FILTERS} filters are allowed")
+
+    group_by = [column(c, 'group_by') for c in _names(plan.get('group_by'), 'group_by')]
+    aggregations = []
+    for a in _names(plan.get('aggregations'), 'aggregations'):
+        if not isinstance(a, dict) or a.get('func') not in AGGREGATES:
+            raise QueryPlanError(f"Invalid aggregation: {a!r}")
+        if a['func'] == 'count' and not a.get('column'):
+            aggregations.append({'column': None, 'func': 'count'})
+            continue
+        col = column(a.get('column'), 'aggregations')
+        if a['func'] != 'count' and not pd.api.types.is_numeric_dtype(df[col]):
+            raise QueryPlanError(f"Cannot {a['func']} non-numeric column {col!r}")
+        aggregations.append({'column': col, 'func': a['func']})
+    if group_by and not aggregations:
+        aggregations = [{'column': None, 'func': 'count'}]
+
+    selected = [column(c, 'columns') for c in _names(plan.get('columns'), 'columns')]
+    sort = []
+    for s in _names(plan.get('sort'), 'sort'):
+        if not isinstance(s, dict) or not isinstance(s.get('column'), str):
+            raise QueryPlanError(f"Invalid sort: {s!r}")
+        sort.append({'column': s['column'], 'descending': bool(s.get('descending', False))})
+
+    limit = plan.get('limit', MAX_RESULT_ROWS)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        raise QueryPlanError("'limit' must be a positive integer")
+
+    return {'filters': filters, 'group_by': group_by, 'aggregations': aggregations,
+            'columns': selected, 'sort': sort, 'limit': min(limit, MAX_RESULT_ROWS)}
+
+
+def estimate_memory(df, plan):
+    """Rough peak working memory of a plan: referenced columns plus masks and group ids"""
+    referenced = {f['column'] for f in plan['filters']} | set(plan['group_by']) | set(plan['columns'])
+    referenced |= {a['column'] for a in plan['aggregations'] if a['column'] is not None}
+    if not plan['aggregations'] and not plan['columns']:
+        referenced = set(df.columns)
+    column_bytes = sum(int(df[c].memory_usage(index=False, deep=False)) for c in referenced)
+    return 2 * column_bytes + len(df) * 24
+
+
+def _filter_mask(df, filters, deadline):
+    mask = np.ones(len(df), dtype=bool)
+    for f in filters:
+        _check_deadline(deadline)
+        series, op, value = df[f['column']], f['op'], f['value']
+        if pd.api.types.is_datetime64_any_dtype(series) and op not in ('isnull', 'notnull', 'contains'):
+            try:
+                value = [pd.Timestamp(v) for v in value] if isinstance(value, list) else pd.Timestamp(value)
+            except (TypeError, ValueError) as e:
+                raise QueryPlanError(f"Bad date for {f['column']!r}: {value!r} ({e})")
+        try:
+            if op == 'isnull':
+                cond = series.isna()
+            elif op == 'notnull':
+                cond = series.notna()
+            elif op == 'in':
+                cond = series.isin(value)
+            elif op == 'not in':
+                cond = ~series.isin(value)
+            elif op == 'contains':
+                cond = series.astype(str).str.contains(str(value), case=False, regex=False)
+            else:
+                cond = {'==': series.__eq__, '!=': series.__ne__, '>': series.__gt__, '>=': series.__ge__,
+                        '<': series.__lt__, '<=': series.__le__}[op](value)
+        except (TypeError, ValueError) as e:
+            raise QueryPlanError(f"Cannot apply {op!r} to {f['column']!r}: {e}")
+        mask &= cond.fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def _check_deadline(deadline):
+    if time.monotonic() > deadline:
+        raise QueryTimeout("Query exceeded its time limit")
+
+
+def _execute(df, plan, deadline):
+    mask = _filter_mask(df, plan['filters'], deadline)
+    _check_deadline(deadline)
+
+    if plan['aggregations']:
+        if plan['group_by']:
+            # Group codes are cached per column, so only the filter mask is new work
+            index = GroupIndex(df, plan['group_by']).restrict(mask)
+            result = index.labels.copy()
+        else:
+            index = None
+            result = pd.DataFrame(index=[0])
+        for a in plan['aggregations']:
+            _check_deadline(deadline)
+            name = f"{a['func']}({a['column'] or '*'})"
+            if a['column'] is None:
+                values = None
+            elif a['func'] == 'count':
+                # Counting needs no numbers, so text columns can be counted too
+                values = df[a['column']].to_numpy()
+            else:
+                values = df[a['column']].to_numpy(dtype=float, na_value=np.nan)
+            if index is not None:
+                result[name] = index.aggregate(values, a['func'])
+            elif a['func'] == 'count':
+                result[name] = int(mask.sum()) if values is None else int((mask & pd.notna(values)).sum())
+            else:
+                selected = values[mask]
+                result[name] = getattr(np, f"nan{a['func']}")(selected) if np.any(~np.isnan(selected)) else np.nan
+        if index is not None:
+            result = result[index.group_sizes() > 0]
+    else:
+        columns = plan['columns'] or list(df.columns)
+        result = df.loc[mask, columns]
+
+    _check_deadline(deadline)
+    if plan['sort']:
+        missing = [s['column'] for s in plan['sort'] if s['column'] not in result.columns]
+        if missing:
+            raise QueryPlanError(f"Cannot sort by {', '.join(missing)}; result columns are {list(result.columns)}")
+        result = result.sort_values([s['column'] for s in plan['sort']],
+                                    ascending=[not s['descending'] for s in plan['sort']])
+    return result.head(plan['limit']), int(mask.sum())
+
+
+def run_plan(df, plan, timeout=QUERY_TIMEOUT, max_memory=MAX_QUERY_MEMORY):
+    """Validate and execute a plan on the full frame; returns (result, matched_rows)"""
+    plan = validate_plan(plan, df)
+    needed = estimate_memory(df, plan)
+    if needed > max_memory:
+        raise QueryPlanError(f"Query would need ~{needed / 1024 ** 2:.0f} MB, over the "
+                             f"{max_memory / 1024 ** 2:.0f} MB limit; select fewer columns")
+
+    future = _executor.submit(_execute, df, plan, time.monotonic() + timeout)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise QueryTimeout(f"Query exceeded the {timeout:g}s time limit")
+
+
+def format_result(result, matched):
+    """Compact text table for the model"""
+    table = result.to_string(index=False, max_colwidth=40, float_format=lambda v: f"{v:.6g}")
+    return f"{matched:,} rows matched the filters; {len(result)} result rows:\n{table}"
+
+
+def query_tool_handler(df, log=None):
+    """Tool handler for the chat tool loop; errors go back to the model as text so it can retry"""
+    def handle(name, arguments):
+        if name != 'run_query':
+            return f"Error: unknown tool {name!r}"
+        start = time.perf_counter()
+        try:
+            plan = json.loads(arguments or '{}')
+            result, matched = run_plan(df, plan)
+            output = format_result(result, matched)
+        except json.JSONDecodeError as e:
+            plan, output = arguments, f"Error: arguments are not valid JSON ({e})"
+        except (QueryPlanError, TypeError, ValueError) as e:
+            output = f"Error: {e}"
+        if log is not None:
+            log.append({'plan': plan, 'output': output, 'seconds': round(time.perf_counter() - start, 4)})
+        return output
+    return handle
@@ -0,0 +1,102 @@
+import html
+import json
+
+import pandas as pd
+
+from utils.charts import PALETTE, histogram_figure, top_values_figure
+from utils.dataset_version import dataset_version
+from utils.eda import EDAProcessor, data_quality, top_correlations
+from utils.heatmap import heatmap_figure
+
+# Wider matrices are reported as tables only; the heatmap would be unreadable
+HEATMAP_MAX_COLS = 60
+
+
+def frame_json(frame):
+    """JSON-safe records of a frame (NaN becomes null, timestamps ISO strings)"""
+    return json.loads(frame.to_json(orient='split', date_format='iso', default_handler=str))
+
+
+def build_report(df, name, clean_strategy='auto'):
+    """Profile, cleaning result, correlations and charts for one dataset; returns (report dict, figures)"""
+    processor = EDAProcessor(df)
+    summary = processor.get_summary()
+    stats = processor.get_stats()
+
+    cleaned = processor.clean_data(clean_strategy)
+    missing_before = df.isnull().sum()
+    missing_after = cleaned.isnull().sum()
+    filled = pd.DataFrame({'missing_before': missing_before, 'missing_after': missing_after})
+    filled = filled[filled['missing_before'] > 0]
+
+    report = {
+        'name': name,
+        'version': dataset_version(df),
+        'rows': summary['shape'][0],
+        'columns': summary['shape'][1],
+        'missing': int(summary['missing']),
+        'memory_mb': summary['memory_mb'],
+        'dtypes': {str(k): int(v) for k, v in summary['dtypes'].items()},
+        'quality': data_quality(df, processor.num_cols),
+        'numeric': frame_json(stats['numeric']) if 'numeric' in stats else None,
+        'categorical': {str(col): frame_json(counts.to_frame()) for col, counts in stats.get('categorical', {}).items()},
+        'datetime': frame_json(stats['datetime']) if 'datetime' in stats else None,
+        'cleaning': {
+            'strategy': clean_strategy,
+            'version': dataset_version(cleaned),
+            'missing_after': int(missing_after.sum()),
+            'columns': frame_json(filled),
+        },
+        'correlations': None,
+        'top_correlations': None,
+    }
+
+    figures = []
+    if processor.num_cols:
+        figures.append(histogram_figure(df, processor.num_cols[:4], PALETTE))
+    for col in processor.cat_cols[:2]:
+        figures.append(top_values_figure(df[col], PALETTE))
+    if len(processor.num_cols) > 1:
+        corr = df[processor.num_cols].corr()
+        report['correlations'] = frame_json(corr.round(4))
+        report['top_correlations'] = frame_json(top_correlations(corr, 10))
+        if len(corr.columns) <= HEATMAP_MAX_COLS:
+            figures.append(heatmap_figure(corr, '🔗 Feature Correlation Matrix'))
+    return report, figures
+
+
+def _table(payload, index=True):
+    """HTML table from a frame_json payload"""
+    frame = pd.DataFrame(payload['data'], columns=payload['columns'], index=payload.get('index'))
+    return frame.to_html(index=index, float_format=lambda v: f"{v:,.4g}", na_rep='', border=0)
+
+
+def render_html(report, figures, plotlyjs='cdn'):
+    """Standalone HTML page for one report; ``plotlyjs=True`` inlines plotly.js for offline viewing"""
+    sections = [f"<h1>📊 {html.escape(report['name'])}</h1>",
+                f"<p>{report['rows']:,} rows × {report['columns']} columns • {report['missing']:,} missing cells • "
+                f"{report['memory_mb']} MB • quality score {report['quality']['quality_score']}% • "
+                f"version {report['version']}</p>"]
+    if report['numeric']:
+        sections += ["<h2>Numeric Variables</h2>", _table(report['numeric'])]
+    if report['datetime']:
+        sections += ["<h2>Datetime Variables</h2>", _table(report['datetime'])]
+    for col, counts in report['categorical'].items():
+        sections += [f"<h3>{html.escape(col)} - Top Values</h3>", _table(counts)]
+
+    cleaning = report['cleaning']
+    sections.append(f"<h2>🧹 Cleaning ({html.escape(cleaning['strategy'])})</h2>")
+    sections.append(_table(cleaning['columns']) if cleaning['columns']['data'] else "<p>No missing values.</p>")
+
+    if report['top_correlations']:
+        sections += ["<h2>🔗 Strongest Relationships</h2>", _table(report['top_correlations'], index=False)]
+
+    sections.append("<h2>Charts</h2>")
+    for i, fig in enumerate(figures):
+        sections.append(fig.to_html(full_html=False, include_plotlyjs=plotlyjs if i == 0 else False))
+
+    return ("<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(report['name'])}</title>"
+            "<style>body{font-family:sans-serif;margin:2rem} table{border-collapse:collapse;margin:1rem 0}"
+            "td,th{padding:.25rem .6rem;border-bottom:1px solid #ddd;text-align:right}</style>"
+            "</head><body>" + "\n".join(sections) + "</body></html>")
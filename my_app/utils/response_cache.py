@@ -0,0 +1,121 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from utils.paths import data_path
+
+DEFAULT_TTL = 24 * 3600
+MAX_CACHE_BYTES = 50 * 1024 ** 2
+
+
+def normalize_question(question):
+    """Case, whitespace and trailing punctuation don't change the answer"""
+    return re.sub(r'\s+', ' ', question.strip().lower()).rstrip('?!. ')
+
+
+class ResponseCache:
+    """SQLite-backed answer cache shared by all sessions, with TTL and size-based eviction"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=MAX_CACHE_BYTES):
+        self.path = path or data_path("response_cache.sqlite")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    meta TEXT,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def make_key(**parts):
+        """Stable hash of everything that affects the answer"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key):
+        """Cached entry as a dict, or None if missing or expired"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT answer, latency, created, hits FROM responses WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET hits = hits + 1, last_access = ? WHERE key = ?", (now, key))
+        return {'answer': row[0], 'latency': row[1], 'created': row[2], 'hits': row[3] + 1}
+
+    def contains(self, key):
+        """Whether a fresh entry exists, without counting it as a hit"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT created FROM responses WHERE key = ?", (key,)).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def put(self, key, answer, latency, meta=None):
+        now = time.time()
+        size = len(answer.encode()) + len(key)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, answer, latency, meta, size, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, answer, latency, json.dumps(meta or {}, default=str), size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until under the size cap"""
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Entry count, stored bytes and lifetime hits"""
+        with closing(self._connect()) as conn:
+            entries, size, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+        return {'entries': entries, 'bytes': size, 'hits': hits}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The shared response cache for this server process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
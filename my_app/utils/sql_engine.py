@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.memory import get_governor
+from utils.tracing import span
+
+# Formats DuckDB reads straight from the uploaded file, without pandas
+FILE_READERS = {'.csv': 'read_csv_auto', '.json': 'read_json_auto'}
+PAGE_SIZES = [100, 500, 1000, 5000]
+DEFAULT_QUERY = "SELECT * FROM data LIMIT 1000"
+# Fetching everything stops here; larger results are for LIMIT or download from SQL itself
+MAX_FETCH_ROWS = 1_000_000
+# Floor for a database's memory limit when the governor's budget is very small
+MIN_QUERY_MEMORY = 64 * 1024 ** 2
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def connect(allowed_paths=(), profiling=False):
+    """New in-memory DuckDB database that reads no files but ``allowed_paths`` and whose settings are locked
+
+    Extensions can't be installed or loaded, COPY and ATTACH can't reach the disk, and memory is capped at
+    the governor's per-dataset limit.
+    """
+    governor = get_governor()
+    engine = duckdb.connect(':memory:', config={
+        'threads': os.cpu_count() or 1,
+        'memory_limit': f"{max(governor.max_dataset_bytes, MIN_QUERY_MEMORY) // 1024 ** 2}MB",
+        'temp_directory': os.path.join(governor.spill_dir, 'duckdb'),
+        'autoinstall_known_extensions': False,
+        'autoload_known_extensions': False,
+    })
+    if profiling:
+        engine.execute("SET enable_profiling = 'no_output'")
+    if allowed_paths:
+        engine.execute("SET allowed_paths = ?", [list(allowed_paths)])
+    engine.execute("SET enable_external_access = false")
+    engine.execute("SET lock_configuration = true")
+    return engine
+
+
+def get_engine():
+    """Locked-down database shared by the app's own queries (EDA); each runs on its own cursor"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = connect()
+        return _engine
+
+
+def quote(name):
+    """SQL identifier for a column name"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def arrow_table(df):
+    """Arrow view of a frame; numeric and Arrow-backed string columns are shared, not copied"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns have no Arrow type; query them as text
+        mixed = {col: str for col in df.select_dtypes(include=['object']).columns}
+        return pa.Table.from_pandas(df.astype(mixed), preserve_index=False)
+
+
+def open_cursor(df):
+    """Cursor on the shared engine with ``data`` (the frame) registered"""
+    cursor = get_engine().cursor()
+    cursor.register('data', arrow_table(df))
+    return cursor
+
+
+def open_console(df=None, source_path=None):
+    """Database of its own for one console query, with ``data`` (the frame) and ``file`` (the uploaded
+    file, read lazily) registered; the uploaded file is the only one it may read
+    """
+    reader = FILE_READERS.get(os.path.splitext(source_path or '')[1].lower())
+    if reader:
+        source_path = os.path.abspath(source_path)
+    engine = connect(allowed_paths=[source_path] if reader else (), profiling=True)
+    if df is not None:
+        engine.register('data', arrow_table(df))
+    if reader:
+        path = source_path.replace("'", "''")
+        engine.execute(f"CREATE TEMP VIEW file AS SELECT * FROM {reader}('{path}')")
+    return engine
+
+
+def rows_scanned(profile):
+    """Rows produced by the table scans of a finished query (after filters pushed into the scan)"""
+    total = 0
+    stack = [profile]
+    while stack:
+        node = stack.pop()
+        if node.get('operator_type') == 'TABLE_SCAN':
+            total += node.get('operator_cardinality', 0)
+        stack.extend(node.get('children', []))
+    return total
+
+
+class QueryResult:
+    """A console query whose result streams back a page at a time
+
+    Each query gets a database of its own, so tables it creates are gone when it closes.
+    """
+
+    def __init__(self, sql, df=None, source_path=None, page_size=1000):
+        self.sql = sql
+        self.page_size = page_size
+        self.pages = []
+        self.done = False
+        self.seconds = 0.0
+        self.rows_scanned = None
+        self._db = open_console(df, source_path)
+        start = time.perf_counter()
+        try:
+            with span("sql.query"):
+                self._reader = self._db.execute(sql).to_arrow_reader(page_size)
+        except Exception:
+            self._db.close()
+            raise
+        self.seconds += time.perf_counter() - start
+        self.columns = self._reader.schema.names
+        self.first_page_seconds = None
+        self.fetch_page()
+        self.first_page_seconds = self.seconds
+
+    @property
+    def rows_fetched(self):
+        return sum(len(page) for page in self.pages)
+
+    def fetch_page(self):
+        """Next page of rows as a frame, or None once the result is exhausted"""
+        if self.done:
+            return None
+        start = time.perf_counter()
+        batches = []
+        rows = 0
+        with span("sql.fetch", page=len(self.pages)):
+            while rows < self.page_size:
+                try:
+                    batch = self._reader.read_next_batch()
+                except StopIteration:
+                    self._finish()
+                    break
+                batches.append(batch)
+                rows += batch.num_rows
+        self.seconds += time.perf_counter() - start
+        if not batches and self.pages:
+            return None
+        page = pa.Table.from_batches(batches, schema=self._reader.schema).to_pandas()
+        self.pages.append(page)
+        return page
+
+    def _finish(self):
+        self.done = True
+        profile = json.loads(self._db.get_profiling_information(format='json'))
+        self.rows_scanned = rows_scanned(profile)
+        self._db.close()
+
+    def close(self):
+        if not self.done:
+            self.done = True
+            self._db.close()
+
+    def frame(self):
+        """Every row fetched so far"""
+        return pd.concat(self.pages, ignore_index=True) if self.pages else pd.DataFrame(columns=self.columns)
+
+
+def query_frame(sql, df):
+    """Run a query over ``data`` to completion and return it as a frame"""
+    cursor = open_cursor(df)
+    try:
+        return cursor.execute(sql).df()
+    finally:
+        cursor.close()
+
+
+def describe_numeric(df, columns):
+    """``DataFrame.describe()`` for numeric columns in one parallel scan"""
+    exprs = []
+    for col in columns:
+        q = quote(col)
+        # The list form sorts each column once for all three quartiles
+        exprs.append(f"[count({q}), avg({q}), stddev_samp({q}), min({q})] || "
+                     f"quantile_cont({q}, [0.25, 0.5, 0.75]) || [max({q})]")
+    row = query_frame(f"SELECT {', '.join(exprs)} FROM data", df[columns]).iloc[0]
+    values = [[np.nan if v is None else float(v) for v in stats] for stats in row]
+    return pd.DataFrame(np.array(values).T, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                        columns=columns)
+
+
+def top_values(df, column, n=5):
+    """``value_counts().head(n)`` of one column"""
+    q = quote(column)
+    counts = query_frame(f"SELECT {q} AS value, count(*) AS count FROM data WHERE {q} IS NOT NULL "
+                         f"GROUP BY {q} ORDER BY count DESC, value LIMIT {int(n)}", df[[column]])
+    return pd.Series(counts['count'].to_numpy(), index=pd.Index(counts['value'], name=column), name='count')
+
+
+def group_aggregate(df, by, measures, agg):
+    """One row per group with ``agg`` of each measure (or a row count), largest first"""
+    keys = ', '.join(quote(col) for col in by)
+    if agg == 'count':
+        exprs = ["count(*) AS count"]
+    else:
+        func = {'mean': 'avg'}.get(agg, agg)
+        exprs = [f"{func}({quote(col)}) AS {quote(f'{agg}({col})')}" for col in measures]
+    sql = (f"SELECT {keys}, {', '.join(exprs)} FROM data GROUP BY {keys} ORDER BY {len(by) + 1} DESC NULLS LAST, {keys}")
+    return query_frame(sql, df[list(dict.fromkeys(list(by) + list(measures)))])
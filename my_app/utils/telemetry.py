@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from utils.paths import data_path
+
+# USD per million tokens (input, output); public list prices, override as needed
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+LATENCY_COLUMNS = ['total_ms', 'ttft_ms', 'queue_ms', 'network_ms', 'context_ms']
+PERCENTILES = [50, 95, 99]
+
+COLUMNS = {
+    'ts': 'REAL NOT NULL',
+    'kind': 'TEXT NOT NULL',
+    'session_id': 'TEXT',
+    'dataset': 'TEXT',
+    'dataset_label': 'TEXT',
+    'model': 'TEXT',
+    'cache': 'TEXT',
+    'streamed': 'INTEGER',
+    'prompt_tokens': 'INTEGER',
+    'completion_tokens': 'INTEGER',
+    'context_tokens': 'INTEGER',
+    'context_ms': 'REAL',
+    'queue_ms': 'REAL',
+    'network_ms': 'REAL',
+    'ttft_ms': 'REAL',
+    'total_ms': 'REAL',
+    'retries': 'INTEGER',
+    'rate_limited': 'INTEGER',
+    'tool_rounds': 'INTEGER',
+    'coalesced': 'INTEGER',
+    'error': 'INTEGER',
+}
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def request_row(kind, stats, model=None, **fields):
+    """Telemetry fields for one request from the stats dict the chat client fills in"""
+    usage = stats.get('usage') or {}
+    total = stats.get('total')
+    queue = stats.get('queue_wait', 0.0) or 0.0
+    tools = sum(q.get('seconds', 0) for q in stats.get('queries', []))
+    network = None
+    if total is not None and stats.get('cache') != 'hit':
+        # Whatever the request spent neither queued nor running local queries
+        network = max(0.0, total - queue - tools)
+    row = {
+        'ts': time.time(),
+        'kind': kind,
+        'model': model,
+        'cache': stats.get('cache'),
+        'prompt_tokens': usage.get('prompt_tokens', stats.get('prompt_estimate')),
+        'completion_tokens': usage.get('completion_tokens', stats.get('completion_tokens')),
+        'context_tokens': stats.get('context_tokens'),
+        'context_ms': _ms(stats.get('context_time')),
+        'queue_ms': _ms(queue),
+        'network_ms': _ms(network),
+        'ttft_ms': _ms(stats.get('ttft')),
+        'total_ms': _ms(total),
+        'retries': stats.get('retries', 0),
+        'rate_limited': stats.get('rate_limited', 0),
+        'tool_rounds': max(0, stats.get('rounds', 1) - 1),
+        'coalesced': int(bool(stats.get('coalesced'))),
+        'error': int(bool(stats.get('error'))),
+    }
+    row.update(fields)
+    return row
+
+
+class TelemetryStore:
+    """Append-only per-request telemetry in SQLite, queried as DataFrames"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("telemetry.sqlite")
+        self._lock = threading.Lock()
+        columns = ", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS requests (id INTEGER PRIMARY KEY, {columns})")
+            # Stores from before a column was added get it; older rows leave it empty
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(requests)")}
+            for name, kind in COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE requests ADD COLUMN {name} {kind.replace(' NOT NULL', '')}")
+            conn.execute("CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requests_model ON requests (model, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requests_dataset ON requests (dataset, ts)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record(self, row):
+        row = {k: v for k, v in row.items() if k in COLUMNS}
+        names = ", ".join(row)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(f"INSERT INTO requests ({names}) VALUES ({', '.join('?' * len(row))})",
+                         [v if not isinstance(v, bool) else int(v) for v in row.values()])
+
+    def frame(self, since=None, kinds=None):
+        """Requests as a DataFrame, optionally since a unix time and for some kinds"""
+        sql = "SELECT * FROM requests WHERE ts >= ?"
+        params = [since or 0]
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql + " ORDER BY ts", conn, params=params)
+        df['time'] = pd.to_datetime(df['ts'], unit='s')
+        return df
+
+    def clear(self):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM requests")
+
+
+def estimate_cost(df):
+    """Estimated USD per request from token counts and MODEL_PRICES"""
+    prices = df['model'].map(MODEL_PRICES)
+    known = prices.notna()
+    cost = pd.Series(np.nan, index=df.index)
+    if known.any():
+        input_price = prices[known].str[0]
+        output_price = prices[known].str[1]
+        cost[known] = (df.loc[known, 'prompt_tokens'].fillna(0) * input_price
+                       + df.loc[known, 'completion_tokens'].fillna(0) * output_price) / 1e6
+    return cost
+
+
+def percentile_table(df, by, columns=LATENCY_COLUMNS):
+    """p50/p95/p99 of each column per group, plus request counts"""
+    rows = []
+    for key, group in df.groupby(by, dropna=False):
+        row = {by: key, 'requests': len(group)}
+        for column in columns:
+            values = group[column].dropna().to_numpy(dtype=float)
+            for p in PERCENTILES:
+                row[f'{column} p{p}'] = float(np.percentile(values, p)) if len(values) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_telemetry():
+    """The shared telemetry store for this server process"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TelemetryStore()
+        return _store
+
+
+def record_request(kind, stats, model=None, **fields):
+    """Record one request; telemetry must never break the caller"""
+    try:
+        get_telemetry().record(request_row(kind, stats, model, **fields))
+    except sqlite3.Error:
+        pass
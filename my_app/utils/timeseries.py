@@ -0,0 +1,159 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.dataset_version import dataset_version
+
+# Tried in order; the first one that parses the sample wins
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S',
+    '%Y/%m/%d', '%Y/%m/%d %H:%M:%S', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y',
+    '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S',
+    '%d.%m.%Y', '%b %d %Y', '%d %b %Y', '%B %d, %Y', '%Y%m%d',
+]
+DETECT_SAMPLE_SIZE = 200
+MIN_PARSE_RATIO = 0.95
+
+GRANULARITIES = {'Minute': 'm', 'Hour': 'h', 'Day': 'D', 'Month': 'M'}
+AGGREGATES = ['sum', 'mean', 'count', 'min', 'max']
+
+
+@lru_cache(maxsize=512)
+def infer_datetime_format(sample):
+    """Datetime format that parses a tuple of sample strings, or None"""
+    values = pd.Series(sample, dtype=object)
+    for fmt in DATE_FORMATS + ['ISO8601']:
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+        if parsed.notna().mean() >= MIN_PARSE_RATIO:
+            return fmt
+    return None
+
+
+def detect_datetime_columns(df):
+    """Map of text columns that hold dates to their inferred format"""
+    detected = {}
+    for col in df.columns:
+        series = df[col]
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            continue
+
+        sample = series.dropna().head(DETECT_SAMPLE_SIZE)
+        if sample.empty or not all(isinstance(v, str) for v in sample):
+            continue
+        # Cheap rejection before trying any format
+        if not any(ch.isdigit() for ch in sample.iloc[0]):
+            continue
+
+        fmt = infer_datetime_format(tuple(sample))
+        if fmt:
+            detected[col] = fmt
+    return detected
+
+
+def parse_datetime_columns(df):
+    """Convert detected date columns to datetime64; returns (frame, {column: format})"""
+    detected = detect_datetime_columns(df)
+    if not detected:
+        return df, {}
+
+    df = df.copy()
+    parsed_formats = {}
+    for col, fmt in detected.items():
+        parsed = pd.to_datetime(df[col], format=fmt, errors='coerce')
+        # Keep the original text if the full column doesn't really parse
+        if parsed.notna().sum() >= MIN_PARSE_RATIO * df[col].notna().sum():
+            df[col] = parsed
+            parsed_formats[col] = fmt
+    return df, parsed_formats
+
+
+class TimeIndex:
+    """Rows sorted once by time so resampling is aggregation over contiguous slices"""
+
+    def __init__(self, timestamps):
+        if getattr(timestamps.dt, 'tz', None) is not None:
+            timestamps = timestamps.dt.tz_convert(None)
+        values = timestamps.to_numpy(dtype='datetime64[ns]')
+        valid = np.flatnonzero(~np.isnat(values))
+        self.order = valid[np.argsort(values[valid], kind='stable')]
+        self.times = values[self.order]
+
+    def __len__(self):
+        return len(self.times)
+
+    def buckets(self, granularity):
+        """Bucket labels and the start offset of each bucket in sorted order"""
+        floored = self.times.astype(f'datetime64[{GRANULARITIES[granularity]}]')
+        starts = np.flatnonzero(np.r_[True, floored[1:] != floored[:-1]])
+        return floored[starts].astype('datetime64[ns]'), starts
+
+    def resample(self, values, granularity, agg='sum'):
+        """Aggregate a measure per time bucket"""
+        labels, starts = self.buckets(granularity)
+        index = pd.DatetimeIndex(labels, name='time')
+        if len(starts) == 0:
+            return pd.Series([], index=index, dtype=float)
+
+        sizes = np.diff(np.r_[starts, len(self.times)])
+        if agg == 'count':
+            return pd.Series(sizes, index=index)
+
+        v = np.asarray(values, dtype=float)[self.order]
+        present = ~np.isnan(v)
+        counts = np.add.reduceat(present.astype(np.int64), starts)
+        if agg == 'sum':
+            result = np.add.reduceat(np.where(present, v, 0.0), starts)
+        elif agg == 'mean':
+            sums = np.add.reduceat(np.where(present, v, 0.0), starts)
+            result = np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+        elif agg == 'min':
+            result = np.fmin.reduceat(v, starts)
+        elif agg == 'max':
+            result = np.fmax.reduceat(v, starts)
+        else:
+            raise ValueError(f"Unknown aggregate: {agg}")
+        return pd.Series(result, index=index)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def build_time_index(version, column, _timestamps):
+    """Sorted time index, built once per dataset version and column"""
+    return TimeIndex(_timestamps)
+
+
+@st.fragment
+def show_time_series_panel(df, date_cols, num_cols):
+    """Resample measures by minute/hour/day/month without re-sorting"""
+    col1, col2, col3 = st.columns(3)
+    date_col = col1.selectbox("🕐 Time column", date_cols)
+    granularity = col2.selectbox("📅 Granularity", list(GRANULARITIES), index=2)
+    agg = col3.selectbox("🧮 Aggregate", AGGREGATES)
+
+    measures = num_cols[:3]
+    if agg != 'count':
+        measures = st.multiselect("📈 Measures", num_cols, default=num_cols[:3])
+        if not measures:
+            return
+
+    index = build_time_index(dataset_version(df), date_col, df[date_col])
+    if len(index) == 0:
+        st.info(f"No valid timestamps in {date_col}.")
+        return
+
+    fig = go.Figure()
+    if agg == 'count':
+        series = index.resample(None, granularity, 'count')
+        fig.add_trace(go.Scattergl(x=series.index, y=series.values, mode='lines+markers', name='rows'))
+    else:
+        for col in measures:
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            series = index.resample(values, granularity, agg)
+            fig.add_trace(go.Scattergl(x=series.index, y=series.values, mode='lines+markers', name=str(col)))
+
+    fig.update_layout(height=420, margin=dict(l=10, r=10, t=30, b=10),
+                      legend=dict(orientation='h', y=1.1))
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(series):,} {granularity.lower()} buckets from {len(index):,} timestamps")
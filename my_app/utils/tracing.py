@@ -0,0 +1,138 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# Trace of the rerun running in this context, or None when tracing is off
+_current = ContextVar('trace', default=None)
+
+
+class _NullSpan:
+    """What span() hands out when tracing is off: no clock reads, no allocation"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Nested spans recorded during one rerun"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._ids = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = self._local.__dict__.setdefault('stack', [])
+        record = {'id': next(self._ids), 'parent': stack[-1]['id'] if stack else None, 'name': name,
+                  'depth': len(stack), 'start': time.perf_counter() - self.origin, 'end': None,
+                  'thread': threading.get_ident(), 'attrs': attrs}
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            record['end'] = time.perf_counter() - self.origin
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    @property
+    def total_seconds(self):
+        return max((s['end'] for s in self.spans), default=0.0)
+
+    def to_frame(self):
+        """One row per span in start order, with self time (duration minus direct children)"""
+        import pandas as pd
+        frame = pd.DataFrame(sorted(self.spans, key=lambda s: s['start']),
+                             columns=['id', 'parent', 'name', 'depth', 'start', 'end', 'thread', 'attrs'])
+        frame['seconds'] = frame['end'] - frame['start']
+        children = frame.groupby('parent')['seconds'].sum()
+        frame['self_seconds'] = (frame['seconds'] - frame['id'].map(children).fillna(0)).clip(lower=0)
+        return frame
+
+    def to_trace_events(self):
+        """Chrome trace-event JSON; opens in chrome://tracing, Perfetto or speedscope"""
+        pid = os.getpid()
+        base = self.started_at.timestamp() * 1e6
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f"streamlit: {self.name}"}}]
+        for s in sorted(self.spans, key=lambda s: s['start']):
+            events.append({'name': s['name'], 'cat': s['name'].split('.')[0], 'ph': 'X', 'pid': pid,
+                           'tid': s['thread'], 'ts': round(base + s['start'] * 1e6, 1),
+                           'dur': round((s['end'] - s['start']) * 1e6, 1),
+                           'args': {k: str(v) for k, v in s['attrs'].items()}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def to_json(self):
+        return json.dumps(self.to_trace_events())
+
+
+def start_trace(name, enabled=True):
+    """Begin tracing a rerun in this context; returns the trace, or None when disabled"""
+    trace = Trace(name) if enabled else None
+    _current.set(trace)
+    return trace
+
+
+def resume_trace(trace):
+    """Keep recording into an earlier trace, e.g. across a rerun the script triggered itself"""
+    _current.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current.get()
+
+
+def span(name, **attrs):
+    """Time a block as a child of the innermost open span; nearly free when tracing is off"""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return trace.span(name, **attrs)
+
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def traced_iter(name, iterable, **attrs):
+    """Span covering the consumption of a generator, e.g. a streamed answer"""
+    with span(name, **attrs):
+        yield from iterable
+
+
+def export_trace(trace, directory):
+    """Write a trace-event file and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    stamp = trace.started_at.strftime('%Y%m%d-%H%M%S-%f')
+    safe_name = ''.join(ch if ch.isalnum() else '_' for ch in trace.name)
+    path = os.path.join(directory, f"{safe_name}-{stamp}.trace.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(trace.to_json())
+    return path